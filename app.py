@@ -1,8 +1,19 @@
-from flask import Flask, jsonify, send_from_directory, request
+from flask import Flask, Response, jsonify, send_from_directory, request
 from flask_cors import CORS
 import os
 import json
 import csv
+from bootstrap import get_bundle
+from columnar import FORMAT as COLUMNAR_FORMAT, encode_columns
+from data_events import event_stream, release_stream, reserve_stream
+from data_store import file_digest, get_derived, load_data_file, snapshot_files, snapshot_version
+from history_store import get_player_history
+from identity_registry import CURRENT_SEASON, REGISTRY_FILE, build_lookup, team_code as registry_team_code
+from last_meetings import LAST_MEETINGS_FILE
+from search_index import get_search_index, search
+from snapshot_history import changes_since
+from team_rankings import DEFAULT_WEIGHTS, LOCATIONS, resolve_weights, ranking_list, to_columns
+from validate_data import DATA_FILES, freshness_issue, validation_status
 
 app = Flask(__name__)
 
@@ -50,16 +61,22 @@ def get_teams():
 
 @app.route('/api/players')
 def get_players():
-    """Serve players data from static JSON file with optional filtering"""
+    """Serve players data from static JSON file with optional filtering
+
+    format=columnar returns column arrays (see columnar.py) instead of row objects.
+    """
     try:
         # Get filter parameters
         position_filter = request.args.get('position', '')
         location_filter = request.args.get('location', '')
-        
-        with open('data/players.json', 'r') as f:
-            data = json.load(f)
-        
-        players = data['data']
+        columnar = request.args.get('format') == COLUMNAR_FORMAT
+        filtered = position_filter or (location_filter and location_filter != 'overall')
+
+        if columnar and not filtered:
+            # The unfiltered encoding is built once per players.json snapshot
+            return jsonify(get_derived('players.json', 'players_columnar', lambda data: encode_columns(data['data'])))
+
+        players = load_data_file('players.json')['data']
         
         # Apply position filter if specified
         if position_filter:
@@ -88,16 +105,14 @@ def get_players():
         if location_filter and location_filter != 'overall':
             # Load teams data to get team locations
             try:
-                with open('data/teams.json', 'r') as f:
-                    teams_data = json.load(f)
-                teams = {team['id']: team for team in teams_data['data']}
+                teams = {team['id']: team for team in load_data_file('teams.json')['data']}
                 
                 # Filter players by team location
                 players = [p for p in players if teams.get(p['team_id'], {}).get('location') == location_filter]
             except Exception as e:
                 print(f"Warning: Could not apply location filter: {e}")
         
-        return jsonify(players)
+        return jsonify(encode_columns(players) if columnar else players)
     except FileNotFoundError:
         return jsonify({'error': 'Players data not found'}), 404
     except Exception as e:
@@ -155,8 +170,45 @@ def get_team_rankings_overall():
 
 @app.route('/api/team-rankings')
 def get_team_rankings():
-    """Serve team rankings from static JSON file (alias for team-rankings-overall)"""
-    return get_team_rankings_overall()
+    """Serve team rankings, recomputed from team stats when custom weights are given
+
+    Without parameters this is an alias for team-rankings-overall. Passing any of
+    goals_weight, expected_goals_weight, goals_conceded_weight,
+    expected_goals_conceded_weight, clean_sheets_weight or a location
+    (home/away/overall) re-ranks the cached team stats columns on the fly.
+    """
+    weight_args = {
+        key: request.args[f'{key}_weight']
+        for key in DEFAULT_WEIGHTS
+        if f'{key}_weight' in request.args
+    }
+    location = request.args.get('location')
+    
+    if not weight_args and not location:
+        return get_team_rankings_overall()
+    
+    try:
+        ranking_type = request.args.get('type', 'attack')
+        location = location or 'overall'
+        
+        if ranking_type not in ['attack', 'defense']:
+            return jsonify({'error': f'Ranking type {ranking_type} not found'}), 404
+        if location not in LOCATIONS:
+            return jsonify({'error': f'Location {location} not found'}), 404
+        
+        try:
+            weights = resolve_weights(weight_args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Column layout is built once per team-stats.json version
+        columns = get_derived('team-stats.json', f'ranking_columns_{location}', lambda data: to_columns(data.get(location, [])))
+        return jsonify(ranking_list(columns, ranking_type, weights))
+        
+    except FileNotFoundError:
+        return jsonify({'error': 'Team stats data not found'}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
 @app.route('/api/player-fixture-history')
 def get_player_fixture_history():
@@ -168,31 +220,9 @@ def get_player_fixture_history():
         if not player_name or not opponent_team_id:
             return jsonify({'error': 'Missing player_name or opponent_team_id parameter'}), 400
         
-        # Map current team ID to team code
-        team_id_to_code = {
-            '1': '3',   # Arsenal
-            '2': '7',   # Aston Villa
-            '3': '90',  # Burnley
-            '4': '91',  # Bournemouth
-            '5': '94',  # Brentford
-            '6': '36',  # Brighton
-            '7': '8',   # Chelsea
-            '8': '31',  # Crystal Palace
-            '9': '11',  # Everton
-            '10': '54', # Fulham
-            '11': '2',  # Leeds
-            '12': '14', # Liverpool
-            '13': '43', # Man City
-            '14': '1',  # Man Utd
-            '15': '4',  # Newcastle
-            '16': '17', # Nott'm Forest
-            '17': '56', # Sunderland
-            '18': '6',  # Spurs
-            '19': '21', # West Ham
-            '20': '39', # Wolves
-        }
-        
-        team_code = team_id_to_code.get(opponent_team_id)
+        # Map current team ID to team code through the identity registry
+        lookup = get_derived(REGISTRY_FILE, 'lookup', build_lookup)
+        team_code = registry_team_code(lookup, CURRENT_SEASON, opponent_team_id)
         
         # Reduced logging for performance
         if not team_code:
@@ -201,14 +231,10 @@ def get_player_fixture_history():
                 'is_new_player': False
             })
         
-        # Load real historical data
-        with open('data/player-history.json', 'r') as f:
-            history_data = json.load(f)
+        # Load only the shard holding this player
+        player_data = get_player_history(player_name)
         
-        # Find the player's data by name
-        if player_name in history_data['data']:
-            player_data = history_data['data'][player_name]
-            
+        if player_data is not None:
             # Find the opponent's data using team code
             if team_code in player_data:
                 return jsonify(player_data[team_code])
@@ -228,6 +254,33 @@ def get_player_fixture_history():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/last-meetings')
+def get_last_meetings():
+    """Serve the precomputed last-meeting table (one row per player, opponent code and venue)"""
+    try:
+        return jsonify(load_data_file(LAST_MEETINGS_FILE))
+    except FileNotFoundError:
+        return jsonify({'error': 'Last meetings data not found'}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/search')
+def search_players():
+    """Ranked player and team IDs whose names contain the query (accent-insensitive)"""
+    try:
+        query = request.args.get('q', '')
+        limit = request.args.get('limit', type=int)
+        index = get_search_index()
+        return jsonify({
+            'query': query,
+            'players': search(index['players'], query, limit),
+            'teams': search(index['teams'], query, limit)
+        })
+    except FileNotFoundError:
+        return jsonify({'error': 'Players data not found'}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/team-fixture-history')
 def get_team_fixture_history():
     """Return empty data for team fixture history (not implemented in static version)"""
@@ -238,38 +291,100 @@ def get_team_saves():
     """Return empty data for team saves (not implemented in static version)"""
     return jsonify([])
 
+@app.route('/api/version')
+def get_version():
+    """Version of the current data snapshot, for client-side cache revalidation"""
+    files = snapshot_files()
+    response = jsonify({
+        'version': snapshot_version(files),
+        'files': {filename: (file_digest(filename) or '')[:16] for filename in files}
+    })
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/api/bootstrap')
+def get_bootstrap():
+    """Prebuilt first-render bundle (teams, players, fixtures, FDR, team stats, rankings)"""
+    try:
+        bundle = get_bundle()
+    except FileNotFoundError:
+        return jsonify({'error': 'Bootstrap data not found'}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+    # The ETag is the snapshot version: an unchanged snapshot is a bodyless 304
+    if bundle['version'] in request.if_none_match:
+        response = Response(status=304)
+    elif 'gzip' in request.headers.get('Accept-Encoding', ''):
+        response = Response(bundle['gzip'], mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(bundle['json'], mimetype='application/json')
+    response.set_etag(bundle['version'])
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/api/changes')
+def get_changes():
+    """Players, teams and fixtures inserted, updated or deleted since a snapshot version"""
+    since = request.args.get('since', '')
+    try:
+        changes = changes_since(since)
+    except FileNotFoundError:
+        return jsonify({'error': 'Data not found'}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+    if changes is None:
+        # Not in the snapshot history (too old or never recorded): the client has to reload
+        return jsonify({'error': f'Unknown snapshot version: {since}', 'full_sync': True, 'version': snapshot_version()}), 410
+    response = jsonify(changes)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/api/events')
+def get_events():
+    """Server-Sent Events stream: a 'snapshot' event whenever the data snapshot version changes
+
+    204 when this process can't hold another stream (or streams are off, as on
+    serverless deploys): EventSource stops reconnecting and the planner polls
+    /api/version instead.
+    """
+    slot = reserve_stream()
+    if slot is None:
+        return Response(status=204)
+    response = Response(event_stream(slot), mimetype='text/event-stream')
+    # The stream releases the slot when it ends; this covers a response that is never iterated
+    response.call_on_close(lambda: release_stream(slot))
+    response.headers['Cache-Control'] = 'no-cache'
+    # Keep reverse proxies from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @app.route('/api/data-status')
 def get_data_status():
-    """Return status of all data files"""
-    data_files = [
-        'teams.json',
-        'players.json', 
-        'fixtures.json',
-        'team-stats.json',
-        'team-rankings.json'
-    ]
-    
+    """Return status of all data files from the cached validation results"""
     status = {}
-    for file in data_files:
-        file_path = f'data/{file}'
-        if os.path.exists(file_path):
-            try:
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
-                    status[file] = {
-                        'exists': True,
-                        'last_updated': data.get('last_updated', 'Unknown'),
-                        'size': os.path.getsize(file_path)
-                    }
-            except Exception as e:
-                status[file] = {
-                    'exists': True,
-                    'error': str(e)
-                }
-        else:
+    for file in DATA_FILES:
+        result = validation_status(file)
+        if not result['exists']:
             status[file] = {
                 'exists': False
             }
+            continue
+        
+        status[file] = {
+            'exists': True,
+            'last_updated': result['last_updated'] or 'Unknown',
+            'size': result['size'],
+            'valid': result['valid']
+        }
+        if result['errors']:
+            status[file]['error'] = '; '.join(result['errors'])
+        issue = freshness_issue(result)
+        if issue:
+            status[file]['freshness'] = issue
     
     return jsonify(status)
 
@@ -0,0 +1,103 @@
+import gzip
+import json
+import threading
+from columnar import encode_columns
+from data_store import load_data_file, snapshot_version
+
+# Planner bootstrap bundle.
+#
+# Everything the planner needs for its first render, in one response: teams,
+# players, fixtures, team stats for every location, overall rankings and the
+# fixture difficulty (FDR) matrix. Players are in the columnar wire format.
+# The bundle is serialized and gzipped once per data snapshot version and
+# then served as bytes, so a request costs a version check plus a write.
+BUNDLE_FILES = ['teams.json', 'players.json', 'fixtures.json', 'team-stats.json', 'team-rankings.json']
+STAT_LOCATIONS = ['home', 'away', 'overall']
+RANKING_TYPES = ['attack', 'defense']
+DEFAULT_RANK = 10
+
+# Rank difference thresholds for difficulty 1..6; anything above is 7
+DIFFICULTY_THRESHOLDS = [-13, -7, -2, 1, 6, 12]
+
+# FDR rows per team: [gameweek, opponent_id, is_home, attack difficulty,
+# attack debug, defense difficulty, defense debug]
+FDR_COLUMNS = ['gameweek', 'opponent_id', 'is_home', 'attack', 'attack_debug', 'defense', 'defense_debug']
+
+_bundle = {'version': None}
+_lock = threading.Lock()
+
+def difficulty_bucket(rank_difference):
+    """7-bucket difficulty: negative differences (our rank better than theirs) are easier"""
+    for difficulty, threshold in enumerate(DIFFICULTY_THRESHOLDS, start=1):
+        if rank_difference <= threshold:
+            return difficulty
+    return len(DIFFICULTY_THRESHOLDS) + 1
+
+def _rank(team, field):
+    return team.get(field) or DEFAULT_RANK
+
+def fixture_difficulty(team, opponent, is_home):
+    """(attack difficulty, debug, defense difficulty, debug) for team against opponent
+
+    Attack compares our attack rank with their defense rank (midfielders,
+    forwards and the teams view); defense compares our defense rank with
+    their attack rank (goalkeepers and defenders). Same formula as the planner.
+    """
+    ours, theirs = ('h', 'a') if is_home else ('a', 'h')
+    attack_rank, opponent_defense = _rank(team, f'atk_{ours}_rank'), _rank(opponent, f'def_{theirs}_rank')
+    defense_rank, opponent_attack = _rank(team, f'def_{ours}_rank'), _rank(opponent, f'atk_{theirs}_rank')
+    attack_difference = attack_rank - opponent_defense
+    defense_difference = defense_rank - opponent_attack
+    return (
+        difficulty_bucket(attack_difference), f"ATK{attack_rank}vsDEF{opponent_defense}({attack_difference})",
+        difficulty_bucket(defense_difference), f"DEF{defense_rank}vsATK{opponent_attack}({defense_difference})"
+    )
+
+def build_fdr(teams, fixtures):
+    """{team_id: [FDR row, ...]} in fixture order"""
+    teams_by_id = {team['id']: team for team in teams}
+    fdr = {str(team['id']): [] for team in teams}
+    for fixture in fixtures:
+        gameweek = fixture.get('event')
+        if gameweek is None:
+            continue
+        for team_id, opponent_id, is_home in [
+            (fixture.get('team_h'), fixture.get('team_a'), True),
+            (fixture.get('team_a'), fixture.get('team_h'), False),
+        ]:
+            team, opponent = teams_by_id.get(team_id), teams_by_id.get(opponent_id)
+            if team is None:
+                continue
+            if opponent is None:
+                # Unknown opponent: fall back to the FPL difficulty, as the planner does
+                difficulty = fixture.get('team_h_difficulty' if is_home else 'team_a_difficulty')
+                debug = f"FALLBACK: {difficulty}"
+                row = [gameweek, opponent_id, int(is_home), difficulty, debug, difficulty, debug]
+            else:
+                row = [gameweek, opponent_id, int(is_home), *fixture_difficulty(team, opponent, is_home)]
+            fdr[str(team_id)].append(row)
+    return fdr
+
+def build_bundle(version):
+    """The bootstrap bundle as a dict"""
+    teams, players, fixtures, team_stats, team_rankings = (load_data_file(name) for name in BUNDLE_FILES)
+    return {
+        'version': version,
+        'last_updated': players.get('last_updated'),
+        'teams': teams['data'],
+        'players': encode_columns(players['data']),
+        'fixtures': fixtures['data'],
+        'team_stats': {location: team_stats.get(location, []) for location in STAT_LOCATIONS},
+        'team_rankings': {ranking_type: team_rankings.get(ranking_type, []) for ranking_type in RANKING_TYPES},
+        'fdr_columns': FDR_COLUMNS,
+        'fdr': build_fdr(teams['data'], fixtures['data'])
+    }
+
+def get_bundle():
+    """{'version', 'json', 'gzip'} for the current snapshot, rebuilt only when the version changes"""
+    version = snapshot_version()
+    with _lock:
+        if _bundle['version'] != version:
+            body = json.dumps(build_bundle(version), separators=(',', ':')).encode('utf-8')
+            _bundle.update({'version': version, 'json': body, 'gzip': gzip.compress(body, compresslevel=6)})
+        return dict(_bundle)
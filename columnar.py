@@ -0,0 +1,85 @@
+import math
+
+# Columnar wire format for lists of row objects.
+#
+# Instead of repeating every key in every row, a payload holds one array per
+# field. Each column is encoded by what its values hold:
+#   int    - integers as-is
+#   scaled - decimals sent as integers times 10**digits (0.7 -> 7 at scale 10)
+#   dict   - repeated strings as indexes into a dictionary of distinct values
+#   raw    - anything else (unique strings, mixed types) as-is
+# Missing values are null in every encoding. decode_columns() is the inverse;
+# the planner has the same decoder in JavaScript.
+FORMAT = 'columnar'
+
+# Most decimal places a scaled column may need (beyond this floats stay raw)
+MAX_SCALE_DIGITS = 4
+
+# Strings are dictionary-encoded when there are at most this many distinct
+# values per row (web_name is nearly unique and stays raw; team_name is not)
+DICT_MAX_DISTINCT_RATIO = 0.5
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _scale_digits(values):
+    """Fewest decimal places that represent every value exactly, or None"""
+    for digits in range(MAX_SCALE_DIGITS + 1):
+        scale = 10 ** digits
+        if all(math.isclose(v * scale, round(v * scale), abs_tol=1e-9) for v in values):
+            return digits
+    return None
+
+def encode_column(values):
+    """Encode one column's values: {'type', 'values', ...}"""
+    present = [v for v in values if v is not None]
+
+    if all(_is_int(v) for v in present):
+        return {'type': 'int', 'values': values}
+
+    if all(_is_int(v) or isinstance(v, float) for v in present):
+        digits = _scale_digits(present)
+        if digits is not None:
+            scale = 10 ** digits
+            return {
+                'type': 'scaled',
+                'scale': scale,
+                'values': [None if v is None else round(v * scale) for v in values]
+            }
+
+    if all(isinstance(v, str) for v in present):
+        distinct = list(dict.fromkeys(present))
+        if len(distinct) <= len(values) * DICT_MAX_DISTINCT_RATIO:
+            position = {value: i for i, value in enumerate(distinct)}
+            return {
+                'type': 'dict',
+                'dictionary': distinct,
+                'values': [None if v is None else position[v] for v in values]
+            }
+
+    return {'type': 'raw', 'values': values}
+
+def encode_columns(rows):
+    """Encode a list of row dicts; fields are taken in first-seen order"""
+    fields = list(dict.fromkeys(field for row in rows for field in row))
+    return {
+        'format': FORMAT,
+        'length': len(rows),
+        'fields': fields,
+        'columns': {field: encode_column([row.get(field) for row in rows]) for field in fields}
+    }
+
+def decode_column(column):
+    values = column['values']
+    if column['type'] == 'scaled':
+        scale = column['scale']
+        return [None if v is None else v / scale for v in values]
+    if column['type'] == 'dict':
+        dictionary = column['dictionary']
+        return [None if v is None else dictionary[v] for v in values]
+    return values
+
+def decode_columns(payload):
+    """Row dicts from an encode_columns() payload"""
+    decoded = [decode_column(payload['columns'][field]) for field in payload['fields']]
+    return [dict(zip(payload['fields'], row)) for row in zip(*decoded)]
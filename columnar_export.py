@@ -0,0 +1,244 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from datetime import datetime
+
+# Columnar snapshot format (.col)
+#
+#   8 bytes   magic b'FPLCOL1\n'
+#   8 bytes   little-endian header length
+#   N bytes   JSON header: row count, column names, types, byte offsets and
+#             the string dictionaries for dictionary-encoded columns
+#   ...       column blocks, each 8-byte aligned, little-endian
+#
+# Every column is a flat fixed-width array, so a file can be memory-mapped and
+# read column-at-a-time without parsing (numpy.frombuffer / numpy.memmap work
+# directly with the offsets stored in the header).
+MAGIC = b'FPLCOL1\n'
+
+# Column type -> (array typecode, numpy dtype string)
+COLUMN_TYPES = {
+    'int32': ('i', '<i4'),
+    'float64': ('d', '<f8'),
+    'bool': ('B', 'u1'),
+    'dict': ('i', '<i4'),  # int32 codes into the header dictionary
+}
+
+PLAYERS_SCHEMA = [
+    ('id', 'int32'),
+    ('web_name', 'dict'),
+    ('element_type', 'int32'),
+    ('now_cost', 'int32'),
+    ('team_id', 'int32'),
+    ('team_name', 'dict'),
+    ('total_points', 'int32'),
+    ('goals_scored', 'int32'),
+    ('assists', 'int32'),
+    ('expected_goals', 'float64'),
+    ('expected_assists', 'float64'),
+    ('clean_sheets', 'int32'),
+    ('goals_conceded', 'int32'),
+    ('bonus', 'int32'),
+    ('saves', 'int32'),
+    ('minutes', 'int32'),
+    ('last_cost', 'float64'),
+    ('team_rank', 'int32'),
+]
+
+PLAYER_HISTORY_SCHEMA = [
+    ('player_name', 'dict'),
+    ('opponent_team_code', 'dict'),
+    ('gameweek', 'int32'),
+    ('was_home', 'bool'),
+    ('total_points', 'int32'),
+    ('minutes', 'int32'),
+    ('goals_scored', 'int32'),
+    ('assists', 'int32'),
+    ('clean_sheets', 'int32'),
+    ('goals_conceded', 'int32'),
+    ('bonus', 'int32'),
+    ('saves', 'int32'),
+    ('expected_goals', 'float64'),
+    ('expected_assists', 'float64'),
+    ('expected_goals_conceded', 'float64'),
+]
+
+def _encode_column(values, column_type):
+    """Encode a list of Python values into (array, dictionary or None)"""
+    typecode = COLUMN_TYPES[column_type][0]
+
+    if column_type == 'dict':
+        dictionary = []
+        codes = {}
+        encoded = array(typecode)
+        for value in values:
+            key = '' if value is None else str(value)
+            code = codes.get(key)
+            if code is None:
+                code = codes[key] = len(dictionary)
+                dictionary.append(key)
+            encoded.append(code)
+        return encoded, dictionary
+
+    if column_type == 'float64':
+        # Missing floats become NaN so they stay distinguishable from 0.0
+        return array(typecode, [float('nan') if v is None else float(v) for v in values]), None
+
+    if column_type == 'bool':
+        return array(typecode, [1 if v else 0 for v in values]), None
+
+    return array(typecode, [0 if v is None else int(v) for v in values]), None
+
+def write_columnar(file_path, rows, schema, last_updated=None):
+    """Write a list of row dicts to a columnar snapshot file"""
+    columns = []
+    blocks = []
+    offset = 0
+
+    for name, column_type in schema:
+        encoded, dictionary = _encode_column([row.get(name) for row in rows], column_type)
+        if sys.byteorder != 'little':
+            encoded.byteswap()
+        data = encoded.tobytes()
+        padding = (-len(data)) % 8
+
+        column = {
+            'name': name,
+            'type': column_type,
+            'dtype': COLUMN_TYPES[column_type][1],
+            'offset': offset,
+            'length': len(data)
+        }
+        if dictionary is not None:
+            column['dictionary'] = dictionary
+        columns.append(column)
+        blocks.append(data + b'\0' * padding)
+        offset += len(data) + padding
+
+    header = json.dumps({
+        'last_updated': last_updated or datetime.now().isoformat(),
+        'rows': len(rows),
+        'columns': columns
+    }).encode('utf-8')
+    header += b' ' * ((-len(header)) % 8)
+
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        for block in blocks:
+            f.write(block)
+    os.replace(tmp_path, file_path)
+
+    return len(rows)
+
+def read_columnar(file_path):
+    """Memory-map a columnar snapshot and return (header, columns)
+
+    Columns are zero-copy memoryviews over the mapped file; dictionary-encoded
+    columns are returned as their int32 codes, with the strings available in
+    header['columns'][i]['dictionary'].
+    """
+    with open(file_path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if mapped[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{file_path} is not a columnar snapshot")
+
+    header_length = struct.unpack_from('<Q', mapped, len(MAGIC))[0]
+    data_start = len(MAGIC) + 8
+    header = json.loads(bytes(mapped[data_start:data_start + header_length]))
+    header['data_offset'] = data_start + header_length
+
+    view = memoryview(mapped)
+    columns = {}
+    for column in header['columns']:
+        start = header['data_offset'] + column['offset']
+        raw = view[start:start + column['length']]
+        typecode = COLUMN_TYPES[column['type']][0]
+        if sys.byteorder != 'little' and typecode != 'B':
+            # Big-endian hosts cannot use the mapped bytes directly
+            values = array(typecode, raw.tobytes())
+            values.byteswap()
+            columns[column['name']] = memoryview(values)
+        else:
+            columns[column['name']] = raw.cast(typecode)
+
+    return header, columns
+
+def load_dataframe(file_path):
+    """Load a columnar snapshot into a pandas DataFrame (requires pandas)"""
+    import numpy as np
+    import pandas as pd
+
+    header, columns = read_columnar(file_path)
+
+    frame = {}
+    for column in header['columns']:
+        values = np.frombuffer(columns[column['name']], dtype=column['dtype'])
+        if column['type'] == 'dict':
+            values = pd.Categorical.from_codes(values, categories=column['dictionary'])
+        elif column['type'] == 'bool':
+            values = values.astype(bool)
+        frame[column['name']] = values
+
+    return pd.DataFrame(frame)
+
+def flatten_player_history(history_data):
+    """Flatten {player_name: {team_code: {fixtures: [...]}}} into fixture rows"""
+    rows = []
+    for player_name, opponents in history_data.items():
+        for team_code, opponent_data in opponents.items():
+            for fixture in opponent_data.get('fixtures', []):
+                row = dict(fixture)
+                row['player_name'] = player_name
+                row['opponent_team_code'] = team_code
+                rows.append(row)
+    return rows
+
+def export_players_columnar(players_data, last_updated=None, file_path='data/players.col'):
+    """Write the players snapshot alongside players.json"""
+    try:
+        count = write_columnar(file_path, players_data, PLAYERS_SCHEMA, last_updated)
+        print(f"✅ Exported {count} players to {file_path}")
+        return True
+    except Exception as e:
+        print(f"❌ Error exporting players columnar snapshot: {e}")
+        return False
+
+def export_player_history_columnar(history_data, last_updated=None, file_path='data/player-history.col'):
+    """Write the per-gameweek history snapshot alongside player-history.json"""
+    try:
+        rows = flatten_player_history(history_data)
+        count = write_columnar(file_path, rows, PLAYER_HISTORY_SCHEMA, last_updated)
+        print(f"✅ Exported {count} player history rows to {file_path}")
+        return True
+    except Exception as e:
+        print(f"❌ Error exporting player history columnar snapshot: {e}")
+        return False
+
+def main():
+    """Rebuild columnar snapshots from the existing JSON files"""
+    print("📦 Exporting columnar snapshots...")
+    print("=" * 50)
+
+    if os.path.exists('data/players.json'):
+        with open('data/players.json', 'r') as f:
+            data = json.load(f)
+        export_players_columnar(data['data'], data.get('last_updated'))
+    else:
+        print("⚠️  data/players.json not found, skipping...")
+
+    if os.path.exists('data/player-history.json'):
+        with open('data/player-history.json', 'r') as f:
+            data = json.load(f)
+        export_player_history_columnar(data['data'], data.get('last_updated'))
+    else:
+        print("⚠️  data/player-history.json not found, skipping...")
+
+if __name__ == "__main__":
+    main()
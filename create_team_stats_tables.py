@@ -2,6 +2,7 @@ import psycopg2
 from psycopg2.extras import RealDictCursor
 import json
 from datetime import datetime
+from team_rankings import LOCATIONS, attack_score_sql, defense_score_sql
 
 # Database configuration
 DB_CONFIG = {
@@ -119,6 +120,9 @@ def create_team_stats_tables():
             )
         """)
         
+        # Materialized rank views (saves view is added once players_2025 exists)
+        views = create_rank_views(cursor)
+        
         conn.commit()
         cursor.close()
         conn.close()
@@ -129,6 +133,8 @@ def create_team_stats_tables():
         print("   - team_stats_overall")
         print("   - fixtures_2025")
         print("   - players")
+        for view_name in views:
+            print(f"   - {view_name}")
         
         return True
         
@@ -136,6 +142,91 @@ def create_team_stats_tables():
         print(f"❌ Error creating tables: {e}")
         return False
 
+def rank_view_definitions():
+    """SQL for the materialized views that precompute team ranks and saves
+
+    Returns a list of (view_name, dependency_table, create_sql, unique_index_sql).
+    The score formulas come from team_rankings so SQL and Python rank identically.
+    """
+    location_scores = "\n                UNION ALL".join(f"""
+                SELECT
+                    '{location}' AS location,
+                    ts.team_id,
+                    ts.team_name,
+                    ts.games_played,
+                    {attack_score_sql('ts')} AS attack_score,
+                    {defense_score_sql('ts')} AS defense_score
+                FROM team_stats_{location} ts""" for location in LOCATIONS)
+    
+    return [
+        (
+            'team_ranks_mv',
+            'team_stats_overall',
+            f"""
+            CREATE MATERIALIZED VIEW IF NOT EXISTS team_ranks_mv AS
+            SELECT
+                scores.*,
+                ROW_NUMBER() OVER (PARTITION BY location ORDER BY attack_score DESC NULLS LAST, team_id) AS attack_rank,
+                ROW_NUMBER() OVER (PARTITION BY location ORDER BY defense_score ASC NULLS LAST, team_id) AS defense_rank
+            FROM ({location_scores}
+            ) scores
+            """,
+            "CREATE UNIQUE INDEX IF NOT EXISTS team_ranks_mv_location_team_idx ON team_ranks_mv (location, team_id)"
+        ),
+        (
+            'team_goalkeeper_saves_mv',
+            'players_2025',
+            """
+            CREATE MATERIALIZED VIEW IF NOT EXISTS team_goalkeeper_saves_mv AS
+            SELECT
+                p.team_id,
+                COALESCE(SUM(p.saves), 0) AS total_saves
+            FROM players_2025 p
+            WHERE p.element_type = 1
+            GROUP BY p.team_id
+            """,
+            "CREATE UNIQUE INDEX IF NOT EXISTS team_goalkeeper_saves_mv_team_idx ON team_goalkeeper_saves_mv (team_id)"
+        ),
+    ]
+
+def create_rank_views(cursor):
+    """Create any missing rank views whose source table exists; returns the views present"""
+    created = []
+    for view_name, dependency, create_sql, index_sql in rank_view_definitions():
+        cursor.execute("SELECT to_regclass(%s)", (dependency,))
+        if cursor.fetchone()[0] is None:
+            # players_2025 only exists after the first sync
+            continue
+        cursor.execute(create_sql)
+        cursor.execute(index_sql)
+        created.append(view_name)
+    return created
+
+def refresh_rank_views():
+    """Refresh the rank views after a sync without blocking readers"""
+    try:
+        conn = get_db_connection()
+        conn.autocommit = True
+        cursor = conn.cursor()
+        
+        for view_name in create_rank_views(cursor):
+            cursor.execute("SELECT ispopulated FROM pg_matviews WHERE matviewname = %s", (view_name,))
+            row = cursor.fetchone()
+            # CONCURRENTLY needs an already-populated view with a unique index
+            if row and row[0]:
+                cursor.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view_name}")
+            else:
+                cursor.execute(f"REFRESH MATERIALIZED VIEW {view_name}")
+            print(f"✅ Refreshed {view_name}")
+        
+        cursor.close()
+        conn.close()
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error refreshing rank views: {e}")
+        return False
+
 def populate_initial_data():
     """Populate tables with initial data from FPL API"""
     try:
@@ -150,18 +241,20 @@ def populate_initial_data():
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        # Populate fixtures
-        fixtures = fpl_data.get('events', [])
+        # Populate fixtures (bootstrap-static only has gameweeks, fixtures have their own endpoint)
+        fixtures_response = requests.get("https://fantasy.premierleague.com/api/fixtures/")
+        fixtures_response.raise_for_status()
+        fixtures = fixtures_response.json()
         for fixture in fixtures:
             cursor.execute("""
                 INSERT INTO fixtures_2025 (id, event, team_h, team_a, team_h_difficulty, team_a_difficulty, kickoff_time)
                 VALUES (%s, %s, %s, %s, %s, %s, %s)
                 ON CONFLICT (id) DO NOTHING
             """, (
-                fixture['id'], fixture['id'], 
+                fixture['id'], fixture.get('event'),
                 fixture.get('team_h'), fixture.get('team_a'),
                 fixture.get('team_h_difficulty', 3), fixture.get('team_a_difficulty', 3),
-                fixture.get('deadline_time')
+                fixture.get('kickoff_time')
             ))
         
         # Populate initial team stats with zeros
@@ -210,6 +303,7 @@ def main():
     if create_team_stats_tables():
         print("\n📊 Populating with initial data...")
         populate_initial_data()
+        refresh_rank_views()
         print("\n✅ Database setup complete!")
     else:
         print("\n❌ Failed to create tables")
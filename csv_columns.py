@@ -0,0 +1,163 @@
+import csv
+from array import array
+from columnar_export import COLUMN_TYPES
+
+# Chunked, typed CSV column loader.
+#
+# Reads a CSV in fixed-size row chunks and converts each chunk into one typed
+# array per column (same column types as the .col snapshots), so large files
+# are processed in bounded memory and each conversion runs once per column
+# rather than once per cell through DictReader. 'dict' columns are encoded as
+# int32 codes into a dictionary that is shared across chunks, so per-value
+# lookups (IDs -> mappings) only need to run once per distinct value.
+#
+# For parallel readers a file can also be split into byte ranges that start
+# on line boundaries (split_ranges) and each range read as raw rows
+# (iter_raw_range), so rows can be filtered before they are typed. Ranges
+# assume rows don't contain quoted newlines, which holds for the numeric
+# gameweek stats.
+
+TRUE_VALUES = {'true', 'True', 'TRUE', '1'}
+
+# Columns of player_gameweek_stats.csv used by the historical rebuilds
+GAMEWEEK_SCHEMA = [
+    ('player_id', 'dict'),
+    ('opponent_team', 'dict'),
+    ('gameweek', 'int32'),
+    ('was_home', 'bool'),
+    ('total_points', 'int32'),
+    ('minutes', 'int32'),
+    ('goals_scored', 'int32'),
+    ('assists', 'int32'),
+    ('clean_sheets', 'int32'),
+    ('goals_conceded', 'int32'),
+    ('bonus', 'int32'),
+    ('saves', 'int32'),
+    ('expected_goals', 'float64'),
+    ('expected_assists', 'float64'),
+    ('expected_goals_conceded', 'float64'),
+]
+
+DEFAULT_CHUNK_SIZE = 50000
+
+def _parse_column(values, column_type, dictionary=None, positions=None):
+    """Convert one column of raw strings into a typed array"""
+    typecode = COLUMN_TYPES[column_type][0]
+    if column_type == 'int32':
+        return array(typecode, [int(v) if v else 0 for v in values])
+    if column_type == 'float64':
+        return array(typecode, [float(v) if v else 0.0 for v in values])
+    if column_type == 'bool':
+        return array(typecode, [v in TRUE_VALUES for v in values])
+    if column_type == 'dict':
+        codes = array(typecode)
+        for value in values:
+            code = positions.get(value)
+            if code is None:
+                code = positions[value] = len(dictionary)
+                dictionary.append(value)
+            codes.append(code)
+        return codes
+    raise ValueError(f"Unknown column type {column_type!r}")
+
+def column_indexes(file_path, header, schema):
+    """Position of each schema column in the header"""
+    missing = [name for name, _ in schema if name not in header]
+    if missing:
+        raise ValueError(f"{file_path} is missing columns: {', '.join(missing)}")
+    return [header.index(name) for name, _ in schema]
+
+def typed_columns(rows, schema, indexes, dictionaries=None, positions=None):
+    """Convert raw rows (lists of strings) into {name: typed array} for the schema columns"""
+    width = max(indexes) + 1 if indexes else 0
+    # Pad short rows so zip(*rows) doesn't drop trailing columns
+    rows = [row if len(row) >= width else row + [''] * (width - len(row)) for row in rows]
+    raw_columns = list(zip(*rows)) if rows else [()] * width
+    return {
+        name: _parse_column(
+            raw_columns[index], column_type,
+            (dictionaries or {}).get(name), (positions or {}).get(name)
+        )
+        for (name, column_type), index in zip(schema, indexes)
+    }
+
+def read_header(file_path):
+    """(header columns, byte offset of the first data row)"""
+    with open(file_path, 'rb') as f:
+        line = f.readline()
+        header = next(csv.reader([line.decode('utf-8-sig')]), [])
+        return header, f.tell()
+
+def split_ranges(file_path, start, end, parts):
+    """Split bytes [start, end) into up to parts ranges that each begin on a line start"""
+    if end <= start:
+        return []
+    bounds = [start]
+    with open(file_path, 'rb') as f:
+        for part in range(1, parts):
+            target = start + (end - start) * part // parts
+            if target <= bounds[-1]:
+                continue
+            f.seek(target - 1)
+            f.readline()  # Finish the line the target falls in
+            offset = f.tell()
+            if bounds[-1] < offset < end:
+                bounds.append(offset)
+    bounds.append(end)
+    return list(zip(bounds, bounds[1:]))
+
+def iter_raw_range(file_path, start, end, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield (rows, row_offsets, next_offset) for up to chunk_size CSV rows at a time in bytes [start, end)
+
+    rows are lists of strings; row_offsets[i] is the byte offset where rows[i]
+    starts and next_offset is where the following chunk begins.
+    """
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        offset = start
+        while offset < end:
+            lines = []
+            offsets = []
+            while offset < end and len(lines) < chunk_size:
+                line = f.readline()
+                if not line:
+                    end = offset
+                    break
+                offsets.append(offset)
+                offset += len(line)
+                lines.append(line.decode('utf-8'))
+            if not lines:
+                break
+            yield list(csv.reader(lines)), offsets, offset
+
+def iter_csv_chunks(file_path, schema, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield (row_count, columns, dictionaries) for each chunk of a CSV file
+
+    columns maps name -> typed array for this chunk. dictionaries maps each
+    'dict' column to its list of distinct values; codes index into it and stay
+    valid across chunks (the lists only grow). Empty numeric cells read as 0.
+    """
+    dictionaries = {name: [] for name, column_type in schema if column_type == 'dict'}
+    positions = {name: {} for name in dictionaries}
+
+    with open(file_path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        indexes = column_indexes(file_path, header, schema)
+
+        while True:
+            rows = [row for _, row in zip(range(chunk_size), reader)]
+            if not rows:
+                break
+            yield len(rows), typed_columns(rows, schema, indexes, dictionaries, positions), dictionaries
+
+def load_csv_columns(file_path, schema, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Load a whole CSV into typed columns: (row_count, columns, dictionaries)"""
+    total = 0
+    columns = {name: array(COLUMN_TYPES[column_type][0]) for name, column_type in schema}
+    dictionaries = {}
+    for row_count, chunk, dictionaries in iter_csv_chunks(file_path, schema, chunk_size):
+        total += row_count
+        for name, values in chunk.items():
+            columns[name].extend(values)
+    return total, columns, dictionaries
@@ -0,0 +1,146 @@
+import json
+import os
+import threading
+import time
+from data_store import add_reload_hook, file_digest, snapshot_files, snapshot_version
+
+# Data refresh notifications over Server-Sent Events.
+#
+# One watcher thread per process checks data/ every WATCH_INTERVAL seconds
+# (a stat per file; contents are only re-hashed when a file's mtime or size
+# changes), and the data store's reload hook triggers the same check as soon
+# as a request re-reads a changed file. When the snapshot version changes,
+# every open /api/events stream is woken through one shared condition and
+# sends a 'snapshot' event with the new version and the changed files.
+#
+# An idle stream waits on that condition: no per-connection polling, just a
+# comment line every HEARTBEAT_INTERVAL seconds to keep proxies from closing
+# it. Streams end after STREAM_MAX_SECONDS; EventSource reconnects on its own
+# after RETRY_MS. The watcher only runs while at least one stream is open.
+#
+# Deploy constraint: an open stream occupies its worker. Serve /api/events
+# from an evented worker (gunicorn -k gevent, where the condition and the
+# watcher are greenlets) so idle streams cost next to nothing. Thread-based
+# workers take at most a few streams per process and answer 204 beyond that
+# (DATA_EVENTS_MAX_STREAMS overrides the limit). Serverless deploys (Vercel sets
+# VERCEL) can't hold connections or see data/ change between deploys, so
+# streams are off there and /api/events answers 204, which tells EventSource
+# not to reconnect; the planner then polls /api/version instead.
+WATCH_INTERVAL = float(os.environ.get('DATA_WATCH_INTERVAL', '5'))
+HEARTBEAT_INTERVAL = 25
+STREAM_MAX_SECONDS = int(os.environ.get('DATA_EVENTS_MAX_SECONDS', '600'))
+RETRY_MS = 5000
+
+def _default_max_streams():
+    if os.environ.get('VERCEL'):
+        return 0
+    try:
+        from gevent import monkey
+    except ImportError:
+        return 4
+    return 1000 if monkey.is_module_patched('threading') else 4
+
+MAX_STREAMS = int(os.environ.get('DATA_EVENTS_MAX_STREAMS') or _default_max_streams())
+
+_condition = threading.Condition()
+_state = {'sequence': 0, 'version': None, 'digests': {}, 'changed': []}
+_watcher = {'thread': None}
+_streams = {'open': 0}
+
+def check_for_changes():
+    """Re-read the snapshot version and wake the streams if it changed"""
+    files = snapshot_files()
+    digests = {filename: file_digest(filename) for filename in files}
+    with _condition:
+        if digests == _state['digests']:
+            return
+        previous = _state['digests']
+        changed = sorted(f for f in set(digests) | set(previous) if digests.get(f) != previous.get(f))
+        first = _state['version'] is None
+        _state.update({
+            'version': snapshot_version(files),
+            'digests': digests,
+            'changed': [] if first else changed,
+            'sequence': _state['sequence'] + (0 if first else 1)
+        })
+        _condition.notify_all()
+
+def _watch():
+    while True:
+        with _condition:
+            if _streams['open'] == 0:
+                _watcher['thread'] = None
+                return
+        try:
+            check_for_changes()
+        except Exception as e:
+            print(f"⚠️  Data watcher error: {e}")
+        time.sleep(WATCH_INTERVAL)
+
+def start_watcher():
+    """Start the watcher thread if it isn't running (it stops once no stream is open)"""
+    with _condition:
+        if _watcher['thread'] is None:
+            _watcher['thread'] = threading.Thread(target=_watch, name='data-watcher', daemon=True)
+            _watcher['thread'].start()
+    if _state['version'] is None:
+        check_for_changes()
+
+def reserve_stream():
+    """Take one of this process's stream slots: a slot for event_stream, or None when all are taken
+
+    Check and increment happen under one lock, so concurrent requests can't
+    both take the last slot.
+    """
+    with _condition:
+        if _streams['open'] >= MAX_STREAMS:
+            return None
+        _streams['open'] += 1
+        return {'released': False}
+
+def release_stream(slot):
+    """Give a reserved slot back; safe to call more than once"""
+    with _condition:
+        if not slot['released']:
+            slot['released'] = True
+            _streams['open'] -= 1
+
+def current_state():
+    with _condition:
+        return dict(_state)
+
+def wait_for_change(sequence, timeout):
+    """Block until the snapshot changes past sequence or timeout; returns the current state"""
+    with _condition:
+        _condition.wait_for(lambda: _state['sequence'] != sequence, timeout)
+        return dict(_state)
+
+def format_event(state):
+    payload = json.dumps({'version': state['version'], 'changed': state['changed']})
+    return f"event: snapshot\nid: {state['version']}\ndata: {payload}\n\n"
+
+def event_stream(slot):
+    """SSE stream: the current version on connect, then one event per snapshot change
+
+    Releases the slot from reserve_stream() when it ends. A generator that is
+    never started doesn't run its finally, so the route releases it on close too.
+    """
+    try:
+        start_watcher()
+        state = current_state()
+        yield f"retry: {RETRY_MS}\n\n"
+        # On connect the client learns the current version (and whether it missed a change)
+        yield format_event(state)
+
+        deadline = time.monotonic() + STREAM_MAX_SECONDS
+        while time.monotonic() < deadline:
+            new_state = wait_for_change(state['sequence'], HEARTBEAT_INTERVAL)
+            if new_state['sequence'] == state['sequence']:
+                yield ": keepalive\n\n"
+            else:
+                state = new_state
+                yield format_event(state)
+    finally:
+        release_stream(slot)
+
+add_reload_hook(lambda filename: check_for_changes())
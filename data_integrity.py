@@ -0,0 +1,196 @@
+import json
+import os
+import sys
+from data_store import data_path
+from identity_registry import REGISTRY_FILE, CURRENT_SEASON
+from last_meetings import LAST_MEETINGS_FILE
+
+# Cross-file referential integrity checks.
+#
+# validate_data.py checks the shape of each file on its own; this checks the
+# references between files. Every file is read once, ID indexes (sets and
+# dicts) are built from teams.json and players.json, and every foreign
+# reference is then a constant-time lookup, so a full check is linear in the
+# size of the data. It runs in the pipeline after the export and before the
+# data is committed, so a broken snapshot is never published.
+
+EXPECTED_TEAMS = 20
+STAT_LOCATIONS = ['home', 'away', 'overall']
+RANKING_TYPES = ['attack', 'defense']
+
+def load_json(filename):
+    """Parsed data/<filename>, or None if the file doesn't exist"""
+    try:
+        with open(data_path(filename), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def build_indexes(teams, players):
+    """ID indexes for the reference checks, plus duplicate-key errors"""
+    errors = []
+    team_ids = set()
+    team_codes = {}
+    for team in teams:
+        if team['id'] in team_ids:
+            errors.append(f"teams.json: duplicate team id {team['id']}")
+        team_ids.add(team['id'])
+        if team['code'] in team_codes:
+            errors.append(f"teams.json: duplicate team code {team['code']}")
+        team_codes[team['code']] = team['id']
+
+    player_ids = set()
+    for player in players:
+        if player['id'] in player_ids:
+            errors.append(f"players.json: duplicate player id {player['id']}")
+        player_ids.add(player['id'])
+
+    return {'team_ids': team_ids, 'team_codes': team_codes, 'player_ids': player_ids}, errors
+
+def _missing_refs(rows, field, valid_ids):
+    """Rows whose field is not in valid_ids: (count, first bad value)"""
+    bad = [row.get(field) for row in rows if row.get(field) not in valid_ids]
+    return len(bad), (bad[0] if bad else None)
+
+def check_players(players, indexes):
+    count, first = _missing_refs(players, 'team_id', indexes['team_ids'])
+    if count:
+        return [f"players.json: {count} players reference unknown team_id (first: {first})"]
+    return []
+
+def is_placeholder_fixture(fixture):
+    """Rows without either team are gameweek placeholders from the old sync, not matches"""
+    return fixture.get('team_h') is None and fixture.get('team_a') is None
+
+def check_fixtures(fixtures, indexes):
+    """Team references of real fixtures: (errors, warnings)
+
+    Placeholder rows reference no team, so they are counted as a warning
+    instead; the exporter no longer writes them.
+    """
+    matches = [fixture for fixture in fixtures if not is_placeholder_fixture(fixture)]
+    errors, warnings = [], []
+    for field in ['team_h', 'team_a']:
+        count, first = _missing_refs(matches, field, indexes['team_ids'])
+        if count:
+            errors.append(f"fixtures.json: {count} fixtures reference unknown {field} (first: {first})")
+    placeholders = len(fixtures) - len(matches)
+    if placeholders:
+        warnings.append(f"fixtures.json: {placeholders} placeholder rows without teams (dropped on the next export)")
+    return errors, warnings
+
+def check_team_stats(team_stats, indexes):
+    errors = []
+    for location in STAT_LOCATIONS:
+        rows = team_stats.get(location, [])
+        count, first = _missing_refs(rows, 'team_id', indexes['team_ids'])
+        if count:
+            errors.append(f"team-stats.json: {count} {location} rows reference unknown team_id (first: {first})")
+        missing = indexes['team_ids'] - {row.get('team_id') for row in rows}
+        if missing:
+            errors.append(f"team-stats.json: {location} is missing teams {sorted(missing)}")
+    return errors
+
+def check_team_rankings(team_rankings, indexes):
+    errors = []
+    for ranking_type in RANKING_TYPES:
+        rows = team_rankings.get(ranking_type, [])
+        count, first = _missing_refs(rows, 'team_id', indexes['team_ids'])
+        if count:
+            errors.append(f"team-rankings.json: {count} {ranking_type} rows reference unknown team_id (first: {first})")
+        if len(rows) != len(indexes['team_ids']):
+            errors.append(f"team-rankings.json: {ranking_type} ranks {len(rows)} of {len(indexes['team_ids'])} teams")
+        ranks = sorted(row.get('rank') for row in rows)
+        if ranks != list(range(1, len(rows) + 1)):
+            errors.append(f"team-rankings.json: {ranking_type} ranks are not 1..{len(rows)} without gaps")
+    return errors
+
+def check_registry(registry, indexes, teams):
+    """The registry's current-season team id -> code must agree with teams.json"""
+    registry_teams = registry.get('teams', {}).get(CURRENT_SEASON, {})
+    mismatched = [
+        team['id'] for team in teams
+        if registry_teams.get(str(team['id'])) != team['code']
+    ]
+    if mismatched:
+        return [f"{REGISTRY_FILE}: season {CURRENT_SEASON} team codes disagree with teams.json for ids {mismatched}"]
+    return []
+
+def check_last_meetings(last_meetings, known_codes):
+    """Every opponent code in the last meetings table must be a known team code"""
+    errors = []
+    unknown = [code for code in last_meetings.get('opponents', []) if code not in known_codes]
+    if unknown:
+        errors.append(f"{LAST_MEETINGS_FILE}: {len(unknown)} unknown opponent codes (first: {unknown[0]})")
+    players, opponents = len(last_meetings.get('players', [])), len(last_meetings.get('opponents', []))
+    bad_rows = sum(1 for row in last_meetings.get('rows', []) if not (0 <= row[0] < players and 0 <= row[1] < opponents))
+    if bad_rows:
+        errors.append(f"{LAST_MEETINGS_FILE}: {bad_rows} rows index past the players/opponents lists")
+    return errors
+
+def check_integrity():
+    """Run every cross-file check: returns (errors, warnings)"""
+    files = {name: load_json(name) for name in [
+        'teams.json', 'players.json', 'fixtures.json', 'team-stats.json', 'team-rankings.json'
+    ]}
+    missing = [name for name, data in files.items() if data is None]
+    if missing:
+        return [f"Missing data files: {', '.join(missing)}"], []
+
+    teams = files['teams.json']['data']
+    players = files['players.json']['data']
+    indexes, errors = build_indexes(teams, players)
+    warnings = []
+
+    if len(teams) != EXPECTED_TEAMS:
+        errors.append(f"teams.json: expected {EXPECTED_TEAMS} teams, found {len(teams)}")
+    errors += check_players(players, indexes)
+    fixture_errors, fixture_warnings = check_fixtures(files['fixtures.json']['data'], indexes)
+    errors += fixture_errors
+    warnings += fixture_warnings
+    errors += check_team_stats(files['team-stats.json'], indexes)
+    errors += check_team_rankings(files['team-rankings.json'], indexes)
+
+    # Optional files: only checked when the pipeline has produced them
+    known_codes = set(indexes['team_codes'])
+    registry = load_json(REGISTRY_FILE)
+    if registry is None:
+        warnings.append(f"{REGISTRY_FILE} not found, skipping registry checks")
+    else:
+        errors += check_registry(registry, indexes, teams)
+        for season_teams in registry.get('teams', {}).values():
+            known_codes.update(season_teams.values())
+
+    last_meetings = load_json(LAST_MEETINGS_FILE)
+    if last_meetings is None:
+        warnings.append(f"{LAST_MEETINGS_FILE} not found, skipping last meetings checks")
+    else:
+        errors += check_last_meetings(last_meetings, known_codes)
+
+    return errors, warnings
+
+def main():
+    """Check cross-file references in data/"""
+    print("🔗 Checking data integrity...")
+    print("=" * 50)
+
+    if not os.path.exists(data_path('')):
+        print("❌ Data directory not found!")
+        return False
+
+    errors, warnings = check_integrity()
+    for warning in warnings:
+        print(f"⚠️  {warning}")
+    for error in errors:
+        print(f"❌ {error}")
+
+    print("\n" + "=" * 50)
+    if errors:
+        print(f"❌ Data integrity check failed with {len(errors)} errors!")
+        return False
+    print("🎉 All cross-file references are valid!")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,139 @@
+import glob
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+# In-process cache of the exported data files.
+#
+# Files are parsed once and re-read only when their mtime or size changes, so
+# API requests don't pay for json.load on every call. Expensive structures
+# built from a file (ranking columns, indexes, ...) can be cached alongside it
+# with get_derived() and are dropped automatically when the file changes.
+# Reload hooks (add_reload_hook) are told whenever a cached file is re-read
+# because it changed on disk.
+DATA_DIR = os.environ.get('DATA_DIR', 'data')
+
+_cache = {}
+_lock = threading.Lock()
+
+# SHA-256 per file, recomputed only when the file's mtime or size changes
+_digests = {}
+
+# Export timestamps, left out of the digests: a re-export of unchanged data
+# must not look like a new snapshot
+VOLATILE_KEYS = {'last_updated'}
+
+# Bounded cache for files that are read piecemeal (history shards): least
+# recently used entries are dropped beyond DATA_LRU_SIZE files.
+LRU_SIZE = int(os.environ.get('DATA_LRU_SIZE', '32'))
+_lru = OrderedDict()
+
+_reload_hooks = []
+
+def data_path(filename):
+    return os.path.join(DATA_DIR, filename)
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+def add_reload_hook(callback):
+    """Call callback(filename) after a cached file is reloaded because it changed"""
+    _reload_hooks.append(callback)
+
+def _get_entry(filename, cache=_cache, max_entries=None):
+    """Return the cache entry for filename, reloading it if the file changed"""
+    path = data_path(filename)
+    signature = _file_signature(path)  # Raises FileNotFoundError like open()
+
+    # Lock-free hit for the unbounded cache (the LRU has to reorder under the lock)
+    if not max_entries:
+        entry = cache.get(filename)
+        if entry and entry['signature'] == signature:
+            return entry
+
+    with _lock:
+        entry = cache.get(filename)
+        if entry and entry['signature'] == signature:
+            if max_entries:
+                cache.move_to_end(filename)
+            return entry
+
+        reloaded = entry is not None
+        with open(path, 'r') as f:
+            data = json.load(f)
+
+        entry = {
+            'signature': signature,
+            'data': data,
+            'derived': {}
+        }
+        cache[filename] = entry
+        if max_entries:
+            cache.move_to_end(filename)
+            while len(cache) > max_entries:
+                cache.popitem(last=False)
+
+    # Outside the lock, so hooks can read data files themselves
+    if reloaded:
+        for hook in _reload_hooks:
+            hook(filename)
+    return entry
+
+def load_data_file(filename):
+    """Return the parsed contents of data/<filename>"""
+    return _get_entry(filename)['data']
+
+def load_data_file_lru(filename):
+    """Like load_data_file, but only the LRU_SIZE most recently used such files stay in memory"""
+    return _get_entry(filename, _lru, LRU_SIZE)['data']
+
+def get_derived(filename, name, builder):
+    """Return builder(data) for data/<filename>, cached until the file changes"""
+    entry = _get_entry(filename)
+    derived = entry['derived']
+    if name not in derived:
+        derived[name] = builder(entry['data'])
+    return derived[name]
+
+def canonical_digest(content):
+    """SHA-256 of parsed JSON in a canonical encoding, ignoring VOLATILE_KEYS at the top level"""
+    if isinstance(content, dict):
+        content = {key: value for key, value in content.items() if key not in VOLATILE_KEYS}
+    encoded = json.dumps(content, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+def file_digest(filename):
+    """Digest of the data in data/<filename> (see canonical_digest), or None if it doesn't exist"""
+    path = data_path(filename)
+    try:
+        signature = _file_signature(path)
+    except FileNotFoundError:
+        return None
+
+    cached = _digests.get(filename)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    with open(path, 'r', encoding='utf-8') as f:
+        digest = canonical_digest(json.load(f))
+    _digests[filename] = (signature, digest)
+    return digest
+
+def snapshot_files():
+    """The published data files (data/*.json)"""
+    return sorted(os.path.basename(path) for path in glob.glob(data_path('*.json')))
+
+def snapshot_version(filenames=None):
+    """Short version of the data snapshot: changes whenever any file's data changes
+
+    Content hashes rather than mtimes, so every server instance serving the same
+    export reports the same version, and the export timestamp is ignored, so a
+    daily re-export of unchanged data keeps the version (and client caches).
+    """
+    digest = hashlib.sha256()
+    for filename in filenames or snapshot_files():
+        digest.update(f"{filename}:{file_digest(filename)}\n".encode())
+    return digest.hexdigest()[:16]
@@ -1,244 +1,221 @@
-import json
+import argparse
 import csv
 import os
-from datetime import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+from columnar_export import flatten_player_history
+from data_store import load_data_file
 
-def export_players_to_csv():
-    """Export players data to CSV"""
+PLAYERS_HEADERS = [
+    'id', 'web_name', 'element_type', 'now_cost', 'team_id', 'team_name',
+    'total_points', 'goals_scored', 'assists', 'expected_goals', 'expected_assists',
+    'clean_sheets', 'goals_conceded', 'bonus', 'saves', 'minutes', 'last_cost', 'team_rank'
+]
+
+TEAMS_HEADERS = [
+    'id', 'name', 'short_name', 'code', 'strength', 'atk_h', 'atk_a', 'def_h', 'def_a',
+    'atk_h_rank', 'atk_a_rank', 'def_h_rank', 'def_a_rank'
+]
+
+FIXTURES_HEADERS = [
+    'id', 'event', 'kickoff_time', 'team_h', 'team_a', 'team_h_difficulty', 'team_a_difficulty'
+]
+
+TEAM_STATS_HEADERS = [
+    'team_id', 'team_name', 'games_played', 'goals_scored', 'goals_conceded', 'clean_sheets',
+    'expected_goals', 'expected_goals_conceded', 'wins', 'draws', 'losses', 'points',
+    'attack_rank', 'defense_rank', 'saves'
+]
+
+TEAM_RANKINGS_HEADERS = ['rank', 'team_id', 'team_name', 'weighted_score']
+
+PLAYER_HISTORY_HEADERS = [
+    'player_name', 'opponent_team_code', 'gameweek', 'was_home', 'total_points', 'minutes',
+    'goals_scored', 'assists', 'clean_sheets', 'goals_conceded', 'bonus', 'saves',
+    'expected_goals', 'expected_assists', 'expected_goals_conceded'
+]
+
+LOCATIONS = ['overall', 'home', 'away']
+RANKING_TYPES = ['attack', 'defense']
+
+def write_rows_csv(filename, headers, rows):
+    """Write row dicts to data/<filename> with a single writerows call"""
+    file_path = os.path.join('data', filename)
+    with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(headers)
+        writer.writerows([row.get(header, '') for header in headers] for row in rows)
+    return len(rows)
+
+def store_exports():
+    """CSV exports backed by the cached JSON data files: [(csv filename, json filename, headers, rows_fn)]"""
+    exports = [
+        ('players.csv', 'players.json', PLAYERS_HEADERS, lambda data: data['data']),
+        ('teams.csv', 'teams.json', TEAMS_HEADERS, lambda data: data['data']),
+        ('fixtures.csv', 'fixtures.json', FIXTURES_HEADERS, lambda data: data['data']),
+    ]
+    for location in LOCATIONS:
+        exports.append((
+            f'team-stats-{location}.csv', 'team-stats.json', TEAM_STATS_HEADERS,
+            lambda data, location=location: data.get(location, [])
+        ))
+    for ranking_type in RANKING_TYPES:
+        exports.append((
+            f'team-rankings-{ranking_type}.csv', 'team-rankings.json', TEAM_RANKINGS_HEADERS,
+            lambda data, ranking_type=ranking_type: data.get(ranking_type, [])
+        ))
+    exports.append((
+        'player-history.csv', 'player-history.json', PLAYER_HISTORY_HEADERS,
+        lambda data: flatten_player_history(data['data'])
+    ))
+    return exports
+
+def export_from_store(csv_filename, json_filename, headers, rows_fn):
+    """Export one CSV from the in-memory copy of a JSON data file"""
     try:
-        with open('data/players.json', 'r') as f:
-            data = json.load(f)
-        
-        players = data['data']
-        
-        # Define CSV headers based on the data structure
-        headers = [
-            'id', 'web_name', 'element_type', 'now_cost', 'team_id', 'team_name',
-            'total_points', 'goals_scored', 'assists', 'expected_goals', 'expected_assists',
-            'clean_sheets', 'goals_conceded', 'bonus', 'saves', 'minutes', 'last_cost', 'team_rank'
-        ]
-        
-        with open('data/players.csv', 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=headers)
-            writer.writeheader()
-            
-            for player in players:
-                # Create a row with all fields, using empty string for missing values
-                row = {}
-                for header in headers:
-                    row[header] = player.get(header, '')
-                writer.writerow(row)
-        
-        print(f"✅ Exported {len(players)} players to data/players.csv")
+        count = write_rows_csv(csv_filename, headers, rows_fn(load_data_file(json_filename)))
+        print(f"✅ Exported {count} rows to data/{csv_filename}")
         return True
-        
+    except FileNotFoundError:
+        print(f"⚠️  data/{json_filename} not found, skipping data/{csv_filename}")
+        return False
     except Exception as e:
-        print(f"❌ Error exporting players to CSV: {e}")
+        print(f"❌ Error exporting {csv_filename}: {e}")
         return False
 
-def export_teams_to_csv():
-    """Export teams data to CSV"""
+def database_exports():
+    """CSV exports streamed from PostgreSQL: [(csv filename, query)]"""
+    from export_to_json import FIXTURES_QUERY, PLAYERS_QUERY
+
+    rank_columns = []
+    rank_joins = []
+    for location, suffix in (('home', 'h'), ('away', 'a')):
+        rank_joins.append(
+            f"LEFT JOIN team_ranks_mv r_{suffix} ON r_{suffix}.team_id = t.id AND r_{suffix}.location = '{location}'"
+        )
+    for rank_type, prefix in (('attack', 'atk'), ('defense', 'def')):
+        for suffix in ('h', 'a'):
+            # Teams that have not played at a venue yet get a neutral rank of 10
+            rank_columns.append(
+                f"CASE WHEN r_{suffix}.{rank_type}_score IS NULL THEN 10 "
+                f"ELSE r_{suffix}.{rank_type}_rank END as {prefix}_{suffix}_rank"
+            )
+
+    exports = [
+        ('players.csv', PLAYERS_QUERY),
+        ('teams.csv', f"""
+            SELECT t.id, t.name, t.short_name, t.code, t.strength,
+                   0 as atk_h, 0 as atk_a, 0 as def_h, 0 as def_a,
+                   {', '.join(rank_columns)}
+            FROM teams_2025 t
+            {' '.join(rank_joins)}
+            ORDER BY t.short_name
+        """),
+        ('fixtures.csv', FIXTURES_QUERY),
+    ]
+    for location in LOCATIONS:
+        exports.append((f'team-stats-{location}.csv', f"""
+            SELECT ts.team_id, ts.team_name, ts.games_played, ts.goals_scored, ts.goals_conceded,
+                   ts.clean_sheets, ts.expected_goals, ts.expected_goals_conceded,
+                   ts.wins, ts.draws, ts.losses, ts.points,
+                   r.attack_rank, r.defense_rank, COALESCE(s.total_saves, 0) as saves
+            FROM team_stats_{location} ts
+            LEFT JOIN team_ranks_mv r ON r.team_id = ts.team_id AND r.location = '{location}'
+            LEFT JOIN team_goalkeeper_saves_mv s ON s.team_id = ts.team_id
+            ORDER BY ts.team_name
+        """))
+    for ranking_type in RANKING_TYPES:
+        exports.append((f'team-rankings-{ranking_type}.csv', f"""
+            SELECT {ranking_type}_rank as rank, team_id, team_name, {ranking_type}_score as weighted_score
+            FROM team_ranks_mv
+            WHERE location = 'overall'
+            ORDER BY {ranking_type}_rank
+        """))
+    return exports
+
+def export_from_database(csv_filename, query):
+    """Stream a query result straight into data/<csv_filename> with COPY ... TO STDOUT"""
+    from export_to_json import get_db_connection
+
     try:
-        with open('data/teams.json', 'r') as f:
-            data = json.load(f)
-        
-        teams = data['data']
-        
-        headers = [
-            'id', 'name', 'short_name', 'code', 'strength', 'atk_h', 'atk_a', 'def_h', 'def_a',
-            'atk_h_rank', 'atk_a_rank', 'def_h_rank', 'def_a_rank'
-        ]
-        
-        with open('data/teams.csv', 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=headers)
-            writer.writeheader()
-            
-            for team in teams:
-                row = {}
-                for header in headers:
-                    row[header] = team.get(header, '')
-                writer.writerow(row)
-        
-        print(f"✅ Exported {len(teams)} teams to data/teams.csv")
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        file_path = os.path.join('data', csv_filename)
+        with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
+            cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER true)", csvfile)
+        count = cursor.rowcount
+        cursor.close()
+        conn.close()
+        print(f"✅ Exported {count} rows to {file_path} (COPY)")
         return True
-        
     except Exception as e:
-        print(f"❌ Error exporting teams to CSV: {e}")
+        print(f"❌ Error exporting {csv_filename} from database: {e}")
         return False
 
+def run_store_exports(*csv_filenames):
+    """Run the named JSON-backed CSV exports"""
+    return all([export_from_store(*job) for job in store_exports() if job[0] in csv_filenames])
+
+def export_players_to_csv():
+    """Export players data to CSV"""
+    return run_store_exports('players.csv')
+
+def export_teams_to_csv():
+    """Export teams data to CSV"""
+    return run_store_exports('teams.csv')
+
 def export_fixtures_to_csv():
     """Export fixtures data to CSV"""
-    try:
-        with open('data/fixtures.json', 'r') as f:
-            data = json.load(f)
-        
-        fixtures = data['data']
-        
-        headers = [
-            'id', 'event', 'kickoff_time', 'team_h', 'team_a', 'team_h_difficulty', 'team_a_difficulty',
-            'team_h_score', 'team_a_score', 'finished', 'minutes', 'provisional_start_time',
-            'pulse_id', 'started', 'team_h_difficulty_rank', 'team_a_difficulty_rank'
-        ]
-        
-        with open('data/fixtures.csv', 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=headers)
-            writer.writeheader()
-            
-            for fixture in fixtures:
-                row = {}
-                for header in headers:
-                    row[header] = fixture.get(header, '')
-                writer.writerow(row)
-        
-        print(f"✅ Exported {len(fixtures)} fixtures to data/fixtures.csv")
-        return True
-        
-    except Exception as e:
-        print(f"❌ Error exporting fixtures to CSV: {e}")
-        return False
+    return run_store_exports('fixtures.csv')
 
 def export_team_stats_to_csv():
-    """Export team stats data to CSV"""
-    try:
-        with open('data/team-stats.json', 'r') as f:
-            data = json.load(f)
-        
-        # Export each location's stats
-        for location in ['overall', 'home', 'away']:
-            if location in data:
-                stats = data[location]
-                
-                # Get headers from the first team's stats
-                if stats:
-                    first_team = list(stats.values())[0]
-                    headers = list(first_team.keys())
-                    headers.insert(0, 'team_id')  # Add team_id as first column
-                    
-                    filename = f'data/team-stats-{location}.csv'
-                    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                        writer = csv.DictWriter(csvfile, fieldnames=headers)
-                        writer.writeheader()
-                        
-                        for team_id, team_stats in stats.items():
-                            row = {'team_id': team_id}
-                            for header in headers[1:]:  # Skip team_id as it's already added
-                                row[header] = team_stats.get(header, '')
-                            writer.writerow(row)
-                    
-                    print(f"✅ Exported {len(stats)} team stats ({location}) to {filename}")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ Error exporting team stats to CSV: {e}")
-        return False
+    """Export team stats data to CSV (one file per location)"""
+    return run_store_exports(*[f'team-stats-{location}.csv' for location in LOCATIONS])
 
 def export_team_rankings_to_csv():
-    """Export team rankings data to CSV"""
-    try:
-        with open('data/team-rankings.json', 'r') as f:
-            data = json.load(f)
-        
-        # Export each type's rankings
-        for ranking_type in ['attack', 'defense']:
-            if ranking_type in data:
-                rankings = data[ranking_type]
-                
-                headers = ['rank', 'team_id', 'team_name', 'short_name', 'value']
-                
-                filename = f'data/team-rankings-{ranking_type}.csv'
-                with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.DictWriter(csvfile, fieldnames=headers)
-                    writer.writeheader()
-                    
-                    for rank, team_data in rankings.items():
-                        row = {
-                            'rank': rank,
-                            'team_id': team_data.get('team_id', ''),
-                            'team_name': team_data.get('team_name', ''),
-                            'short_name': team_data.get('short_name', ''),
-                            'value': team_data.get('value', '')
-                        }
-                        writer.writerow(row)
-                
-                print(f"✅ Exported {len(rankings)} team rankings ({ranking_type}) to {filename}")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ Error exporting team rankings to CSV: {e}")
-        return False
+    """Export team rankings data to CSV (one file per ranking type)"""
+    return run_store_exports(*[f'team-rankings-{ranking_type}.csv' for ranking_type in RANKING_TYPES])
 
 def export_player_history_to_csv():
-    """Export player history data to CSV (if available)"""
-    try:
-        with open('data/player-history.json', 'r') as f:
-            data = json.load(f)
-        
-        # This is currently sample data, but we can export it for structure
-        if 'data' in data and 'default' in data['data']:
-            fixtures = data['data']['default']['fixtures']
-            
-            headers = [
-                'gameweek', 'total_points', 'minutes', 'goals_scored', 'assists',
-                'clean_sheets', 'bonus', 'expected_goals', 'expected_assists', 'was_home'
-            ]
-            
-            with open('data/player-history-sample.csv', 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=headers)
-                writer.writeheader()
-                
-                for fixture in fixtures:
-                    row = {}
-                    for header in headers:
-                        row[header] = fixture.get(header, '')
-                    writer.writerow(row)
-            
-            print(f"✅ Exported {len(fixtures)} sample player history records to data/player-history-sample.csv")
-            return True
-        
-        return False
-        
-    except Exception as e:
-        print(f"❌ Error exporting player history to CSV: {e}")
-        return False
+    """Export per-gameweek player history to CSV (if available)"""
+    return run_store_exports('player-history.csv')
 
 def main():
     """Export all data to CSV format"""
+    parser = argparse.ArgumentParser(description='Export FPL data to data/*.csv')
+    parser.add_argument('--from-db', action='store_true',
+                        help='stream tables from PostgreSQL with COPY instead of reading data/*.json')
+    parser.add_argument('--workers', type=int, default=8, help='number of files written concurrently')
+    args = parser.parse_args()
+
     print("🚀 Starting CSV export...")
-    
+
     # Create data directory if it doesn't exist
     os.makedirs('data', exist_ok=True)
-    
-    success_count = 0
-    total_exports = 6
-    
-    # Export each data type
-    if export_players_to_csv():
-        success_count += 1
-    
-    if export_teams_to_csv():
-        success_count += 1
-    
-    if export_fixtures_to_csv():
-        success_count += 1
-    
-    if export_team_stats_to_csv():
-        success_count += 1
-    
-    if export_team_rankings_to_csv():
-        success_count += 1
-    
-    if export_player_history_to_csv():
-        success_count += 1
-    
-    print(f"\n📊 CSV Export Complete: {success_count}/{total_exports} successful")
+
+    jobs = []
+    if args.from_db:
+        jobs.extend((export_from_database, job) for job in database_exports())
+        # Player history is not stored in PostgreSQL, it always comes from the JSON store
+        jobs.extend((export_from_store, job) for job in store_exports() if job[0] == 'player-history.csv')
+    else:
+        jobs.extend((export_from_store, job) for job in store_exports())
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        results = list(executor.map(lambda job: job[0](*job[1]), jobs))
+    elapsed = time.perf_counter() - started
+
+    success_count = sum(results)
+    total_exports = len(jobs)
+
+    print(f"\n📊 CSV Export Complete: {success_count}/{total_exports} successful in {elapsed:.2f}s")
     print(f"📁 CSV files saved in the 'data' directory")
-    
+
     if success_count == total_exports:
         print("✅ All exports successful!")
     else:
         print("⚠️  Some exports failed. Check the error messages above.")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -1,9 +1,14 @@
 import psycopg2
 from psycopg2.extras import RealDictCursor
+import argparse
 import json
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
 from decimal import Decimal
+from columnar_export import export_players_columnar
+from team_rankings import LOCATIONS, ranking_list, to_columns
 
 # Database configuration
 DB_CONFIG = {
@@ -17,175 +22,21 @@ DB_CONFIG = {
 def get_db_connection():
     return psycopg2.connect(**DB_CONFIG)
 
-def export_teams():
-    """Export teams data"""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        cursor.execute("""
-            SELECT
-                t.id,
-                t.name,
-                t.short_name,
-                t.code,
-                t.strength,
-                0 as atk_h,
-                0 as atk_a,
-                0 as def_h,
-                0 as def_a,
-                COALESCE(home_stats.attack_rank, 10) as atk_h_rank,
-                COALESCE(away_stats.attack_rank, 10) as atk_a_rank,
-                COALESCE(home_stats.defense_rank, 10) as def_h_rank,
-                COALESCE(away_stats.defense_rank, 10) as def_a_rank
-            FROM teams_2025 t
-            LEFT JOIN (
-                SELECT 
-                    team_id,
-                    ROW_NUMBER() OVER (ORDER BY (goals_scored * 0.7 + expected_goals * 0.3) / NULLIF(games_played, 0) DESC) as attack_rank,
-                    ROW_NUMBER() OVER (ORDER BY (goals_conceded * 0.6 + expected_goals_conceded * 0.2) / NULLIF(games_played, 0) - (clean_sheets * 0.2) ASC) as defense_rank
-                FROM team_stats_home
-                WHERE games_played > 0
-            ) home_stats ON t.id = home_stats.team_id
-            LEFT JOIN (
-                SELECT 
-                    team_id,
-                    ROW_NUMBER() OVER (ORDER BY (goals_scored * 0.7 + expected_goals * 0.3) / NULLIF(games_played, 0) DESC) as attack_rank,
-                    ROW_NUMBER() OVER (ORDER BY (goals_conceded * 0.6 + expected_goals_conceded * 0.2) / NULLIF(games_played, 0) - (clean_sheets * 0.2) ASC) as defense_rank
-                FROM team_stats_away
-                WHERE games_played > 0
-            ) away_stats ON t.id = away_stats.team_id
-            ORDER BY t.short_name
-        """)
-        
-        teams = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        
-        # Convert to list of dictionaries and handle Decimal types
-        teams_data = []
-        for team in teams:
-            team_dict = dict(team)
-            # Convert Decimal to float
-            for key, value in team_dict.items():
-                if isinstance(value, Decimal):
-                    team_dict[key] = float(value)
-            teams_data.append(team_dict)
-        
-        # Create data directory if it doesn't exist
-        os.makedirs('data', exist_ok=True)
-        
-        # Save to JSON file
-        with open('data/teams.json', 'w') as f:
-            json.dump({
-                'last_updated': datetime.now().isoformat(),
-                'data': teams_data
-            }, f, indent=2)
-        
-        print(f"✅ Exported {len(teams_data)} teams to data/teams.json")
-        return True
-        
-    except Exception as e:
-        print(f"❌ Error exporting teams: {e}")
-        return False
-
-def export_players():
-    """Export players data"""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        cursor.execute("""
-            SELECT p.id, p.web_name, p.element_type, p.now_cost, p.team_id, 
-                   t.short_name as team_name, p.total_points,
-                   p.goals_scored, p.assists, p.expected_goals, p.expected_assists,
-                   p.clean_sheets, p.goals_conceded, p.bonus, p.saves, p.minutes,
-                   CASE 
-                       WHEN p_old.now_cost > 0 AND p_old.now_cost < 20 THEN p_old.now_cost 
-                       ELSE 0 
-                   END as last_cost,
-                   t.strength as team_rank
-            FROM players_2025 p
-            JOIN teams_2025 t ON p.team_id = t.id
-            LEFT JOIN players p_old ON p.id = p_old.id
-            WHERE p.element_type != 5
-            ORDER BY t.name, p.web_name
-        """)
-        
-        players = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        
-        players_data = []
-        for player in players:
-            player_dict = dict(player)
-            # Convert Decimal to float
-            for key, value in player_dict.items():
-                if isinstance(value, Decimal):
-                    player_dict[key] = float(value)
-            players_data.append(player_dict)
-        
-        with open('data/players.json', 'w') as f:
-            json.dump({
-                'last_updated': datetime.now().isoformat(),
-                'data': players_data
-            }, f, indent=2)
-        
-        print(f"✅ Exported {len(players_data)} players to data/players.json")
-        return True
-        
-    except Exception as e:
-        print(f"❌ Error exporting players: {e}")
-        return False
+def to_json_types(row):
+    """Convert a database row to a dict of JSON-serializable values"""
+    row_dict = dict(row)
+    for key, value in row_dict.items():
+        if isinstance(value, Decimal):
+            row_dict[key] = float(value)
+        elif isinstance(value, datetime):
+            row_dict[key] = value.isoformat()
+    return row_dict
 
-def export_fixtures():
-    """Export fixtures data"""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        cursor.execute("""
-            SELECT id, event, team_h, team_a, team_h_difficulty, team_a_difficulty, kickoff_time
-            FROM fixtures_2025 
-            ORDER BY event, kickoff_time
-        """)
-        
-        fixtures = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        
-        fixtures_data = []
-        for fixture in fixtures:
-            fixture_dict = dict(fixture)
-            # Convert datetime to string
-            for key, value in fixture_dict.items():
-                if isinstance(value, datetime):
-                    fixture_dict[key] = value.isoformat()
-                elif isinstance(value, Decimal):
-                    fixture_dict[key] = float(value)
-            fixtures_data.append(fixture_dict)
-        
-        with open('data/fixtures.json', 'w') as f:
-            json.dump({
-                'last_updated': datetime.now().isoformat(),
-                'data': fixtures_data
-            }, f, indent=2)
-        
-        print(f"✅ Exported {len(fixtures_data)} fixtures to data/fixtures.json")
-        return True
-        
-    except Exception as e:
-        print(f"❌ Error exporting fixtures: {e}")
-        return False
-
-def export_team_stats():
-    """Export team stats for all locations"""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Export home stats
-        cursor.execute("""
+def fetch_location_stats(cursor):
+    """Fetch team_stats_home/away/overall rows keyed by location"""
+    stats_by_location = {}
+    for location in LOCATIONS:
+        cursor.execute(f"""
             SELECT 
                 ts.team_id,
                 ts.team_name,
@@ -198,231 +49,374 @@ def export_team_stats():
                 ts.wins,
                 ts.draws,
                 ts.losses,
-                ts.points,
-                ROW_NUMBER() OVER (ORDER BY (ts.goals_scored * 0.7 + ts.expected_goals * 0.3) / NULLIF(ts.games_played, 0) DESC) as attack_rank,
-                ROW_NUMBER() OVER (ORDER BY (ts.goals_conceded * 0.6 + ts.expected_goals_conceded * 0.2) / NULLIF(ts.games_played, 0) - (ts.clean_sheets * 0.2) ASC) as defense_rank,
-                COALESCE(team_saves.total_saves, 0) as saves
-            FROM team_stats_home ts
-            JOIN teams_2025 t ON ts.team_id = t.id
-            LEFT JOIN (
-                SELECT 
-                    p.team_id,
-                    SUM(p.saves) as total_saves
-                FROM players_2025 p
-                WHERE p.element_type = 1
-                GROUP BY p.team_id
-            ) team_saves ON ts.team_id = team_saves.team_id
+                ts.points
+            FROM team_stats_{location} ts
             ORDER BY ts.team_name
         """)
-        
-        home_stats = []
-        for stat in cursor.fetchall():
-            stat_dict = dict(stat)
-            # Convert Decimal to float
-            for key, value in stat_dict.items():
-                if isinstance(value, Decimal):
-                    stat_dict[key] = float(value)
-            home_stats.append(stat_dict)
-        
-        # Export away stats
-        cursor.execute("""
-            SELECT 
-                ts.team_id,
-                ts.team_name,
-                ts.games_played,
-                ts.goals_scored,
-                ts.goals_conceded,
-                ts.clean_sheets,
-                ts.expected_goals,
-                ts.expected_goals_conceded,
-                ts.wins,
-                ts.draws,
-                ts.losses,
-                ts.points,
-                ROW_NUMBER() OVER (ORDER BY (ts.goals_scored * 0.7 + ts.expected_goals * 0.3) / NULLIF(ts.games_played, 0) DESC) as attack_rank,
-                ROW_NUMBER() OVER (ORDER BY (ts.goals_conceded * 0.6 + ts.expected_goals_conceded * 0.2) / NULLIF(ts.games_played, 0) - (ts.clean_sheets * 0.2) ASC) as defense_rank,
-                COALESCE(team_saves.total_saves, 0) as saves
-            FROM team_stats_away ts
-            JOIN teams_2025 t ON ts.team_id = t.id
-            LEFT JOIN (
-                SELECT 
-                    p.team_id,
-                    SUM(p.saves) as total_saves
-                FROM players_2025 p
-                WHERE p.element_type = 1
-                GROUP BY p.team_id
-            ) team_saves ON ts.team_id = team_saves.team_id
-            ORDER BY ts.team_name
-        """)
-        
-        away_stats = []
-        for stat in cursor.fetchall():
-            stat_dict = dict(stat)
-            # Convert Decimal to float
-            for key, value in stat_dict.items():
-                if isinstance(value, Decimal):
-                    stat_dict[key] = float(value)
-            away_stats.append(stat_dict)
-        
-        # Export overall stats
-        cursor.execute("""
-            SELECT 
-                ts.team_id,
-                ts.team_name,
-                ts.games_played,
-                ts.goals_scored,
-                ts.goals_conceded,
-                ts.clean_sheets,
-                ts.expected_goals,
-                ts.expected_goals_conceded,
-                ts.wins,
-                ts.draws,
-                ts.losses,
-                ts.points,
-                ROW_NUMBER() OVER (ORDER BY (ts.goals_scored * 0.7 + ts.expected_goals * 0.3) / NULLIF(ts.games_played, 0) DESC) as attack_rank,
-                ROW_NUMBER() OVER (ORDER BY (ts.goals_conceded * 0.6 + ts.expected_goals_conceded * 0.2) / NULLIF(ts.games_played, 0) - (ts.clean_sheets * 0.2) ASC) as defense_rank,
-                COALESCE(team_saves.total_saves, 0) as saves
-            FROM team_stats_overall ts
-            JOIN teams_2025 t ON ts.team_id = t.id
-            LEFT JOIN (
-                SELECT 
-                    p.team_id,
-                    SUM(p.saves) as total_saves
-                FROM players_2025 p
-                WHERE p.element_type = 1
-                GROUP BY p.team_id
-            ) team_saves ON ts.team_id = team_saves.team_id
-            ORDER BY ts.team_name
-        """)
-        
-        overall_stats = []
-        for stat in cursor.fetchall():
-            stat_dict = dict(stat)
-            # Convert Decimal to float
-            for key, value in stat_dict.items():
-                if isinstance(value, Decimal):
-                    stat_dict[key] = float(value)
-            overall_stats.append(stat_dict)
-        
-        cursor.close()
-        conn.close()
-        
-        # Save all stats
-        team_stats = {
-            'last_updated': datetime.now().isoformat(),
-            'home': home_stats,
-            'away': away_stats,
-            'overall': overall_stats
+        stats_by_location[location] = [to_json_types(row) for row in cursor.fetchall()]
+    return stats_by_location
+
+def fetch_rank_view(cursor):
+    """Read precomputed ranks from team_ranks_mv as {location: {team_id: ranks}}"""
+    cursor.execute("""
+        SELECT location, team_id, attack_score, defense_score, attack_rank, defense_rank
+        FROM team_ranks_mv
+    """)
+    rankings = {location: {} for location in LOCATIONS}
+    for row in cursor.fetchall():
+        rankings[row['location']][row['team_id']] = to_json_types(row)
+    return rankings
+
+def fetch_ranking_list(cursor, ranking_type):
+    """Build the team-rankings.json list for 'attack' or 'defense' from team_ranks_mv
+
+    Every team is listed; teams that have not played yet rank last (NULLS LAST
+    in the view) with a null weighted_score.
+    """
+    cursor.execute(f"""
+        SELECT team_id, team_name, {ranking_type}_rank as rank, {ranking_type}_score as weighted_score
+        FROM team_ranks_mv
+        WHERE location = 'overall'
+        ORDER BY {ranking_type}_rank
+    """)
+    return [
+        {
+            'team_id': row['team_id'],
+            'team_name': row['team_name'],
+            'rank': row['rank'],
+            'weighted_score': float(row['weighted_score']) if row['weighted_score'] is not None else None
         }
-        
-        with open('data/team-stats.json', 'w') as f:
-            json.dump(team_stats, f, indent=2)
-        
+        for row in cursor.fetchall()
+    ]
+
+TEAMS_QUERY = """
+    SELECT
+        t.id,
+        t.name,
+        t.short_name,
+        t.code,
+        t.strength,
+        0 as atk_h,
+        0 as atk_a,
+        0 as def_h,
+        0 as def_a
+    FROM teams_2025 t
+    ORDER BY t.short_name
+"""
+
+PLAYERS_QUERY = """
+    SELECT p.id, p.web_name, p.element_type, p.now_cost, p.team_id, 
+           t.short_name as team_name, p.total_points,
+           p.goals_scored, p.assists, p.expected_goals, p.expected_assists,
+           p.clean_sheets, p.goals_conceded, p.bonus, p.saves, p.minutes,
+           CASE 
+               WHEN p_old.now_cost > 0 AND p_old.now_cost < 20 THEN p_old.now_cost 
+               ELSE 0 
+           END as last_cost,
+           t.strength as team_rank
+    FROM players_2025 p
+    JOIN teams_2025 t ON p.team_id = t.id
+    LEFT JOIN players p_old ON p.id = p_old.id
+    WHERE p.element_type != 5
+    ORDER BY t.name, p.web_name
+"""
+
+# Rows without teams are gameweek placeholders the old sync stored as
+# fixtures; they are not matches, so they are never exported.
+FIXTURES_QUERY = """
+    SELECT id, event, team_h, team_a, team_h_difficulty, team_a_difficulty, kickoff_time
+    FROM fixtures_2025 
+    WHERE team_h IS NOT NULL AND team_a IS NOT NULL
+    ORDER BY event, kickoff_time
+"""
+
+def fetch_teams():
+    """Fetch teams with home/away attack and defence ranks"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    
+    cursor.execute(TEAMS_QUERY)
+    teams = cursor.fetchall()
+    rankings = fetch_rank_view(cursor)
+    cursor.close()
+    conn.close()
+    
+    # Teams that have not played at a venue yet get a neutral rank of 10
+    teams_data = []
+    for team in teams:
+        team_dict = to_json_types(team)
+        for rank_type, prefix in (('attack', 'atk'), ('defense', 'def')):
+            for location, suffix in (('home', 'h'), ('away', 'a')):
+                ranks = rankings[location].get(team_dict['id'], {})
+                has_played = ranks.get(f'{rank_type}_score') is not None
+                team_dict[f'{prefix}_{suffix}_rank'] = ranks[f'{rank_type}_rank'] if has_played else 10
+        teams_data.append(team_dict)
+    
+    return {
+        'last_updated': datetime.now().isoformat(),
+        'data': teams_data
+    }
+
+def fetch_players():
+    """Fetch current players with last season's cost"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    
+    cursor.execute(PLAYERS_QUERY)
+    players = cursor.fetchall()
+    cursor.close()
+    conn.close()
+    
+    return {
+        'last_updated': datetime.now().isoformat(),
+        'data': [to_json_types(player) for player in players]
+    }
+
+def fetch_fixtures():
+    """Fetch fixtures ordered by gameweek"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    
+    cursor.execute(FIXTURES_QUERY)
+    fixtures = cursor.fetchall()
+    cursor.close()
+    conn.close()
+    
+    return {
+        'last_updated': datetime.now().isoformat(),
+        'data': [to_json_types(fixture) for fixture in fixtures]
+    }
+
+def fetch_team_stats():
+    """Fetch home/away/overall team stats with ranks and goalkeeper saves"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    
+    stats_by_location = fetch_location_stats(cursor)
+    
+    rankings = fetch_rank_view(cursor)
+    
+    # Goalkeeper saves per team
+    cursor.execute("SELECT team_id, total_saves FROM team_goalkeeper_saves_mv")
+    team_saves = {row['team_id']: row['total_saves'] for row in cursor.fetchall()}
+    
+    cursor.close()
+    conn.close()
+    
+    for location, stats in stats_by_location.items():
+        for stat in stats:
+            ranks = rankings[location][stat['team_id']]
+            stat['attack_rank'] = ranks['attack_rank']
+            stat['defense_rank'] = ranks['defense_rank']
+            stat['saves'] = int(team_saves.get(stat['team_id'], 0))
+    
+    return {
+        'last_updated': datetime.now().isoformat(),
+        'home': stats_by_location['home'],
+        'away': stats_by_location['away'],
+        'overall': stats_by_location['overall']
+    }
+
+def fetch_team_rankings():
+    """Fetch overall attack and defence rankings"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    
+    attack_rankings = fetch_ranking_list(cursor, 'attack')
+    defense_rankings = fetch_ranking_list(cursor, 'defense')
+    cursor.close()
+    conn.close()
+    
+    return {
+        'last_updated': datetime.now().isoformat(),
+        'attack': attack_rankings,
+        'defense': defense_rankings
+    }
+
+def team_rankings_from_stats():
+    """Rebuild the team rankings from data/team-stats.json without the database
+
+    ranking_list orders teams the same way as team_ranks_mv, so this matches
+    fetch_team_rankings for the same stats.
+    """
+    with open(os.path.join('data', 'team-stats.json'), 'r') as f:
+        columns = to_columns(json.load(f)['overall'])
+    
+    return {
+        'last_updated': datetime.now().isoformat(),
+        'attack': ranking_list(columns, 'attack'),
+        'defense': ranking_list(columns, 'defense')
+    }
+
+def encode_json(payload):
+    """Serialize an export payload (runs in a worker process in parallel mode)"""
+    return json.dumps(payload, indent=2)
+
+def write_json_file(filename, content):
+    """Atomically write encoded JSON to data/<filename>"""
+    os.makedirs('data', exist_ok=True)
+    file_path = os.path.join('data', filename)
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(content)
+    os.replace(tmp_path, file_path)
+    return file_path
+
+def summarize_export(filename, payload):
+    """Print the per-file export summary"""
+    if filename == 'team-stats.json':
         print(f"✅ Exported team stats to data/team-stats.json")
-        print(f"   - Home: {len(home_stats)} teams")
-        print(f"   - Away: {len(away_stats)} teams")
-        print(f"   - Overall: {len(overall_stats)} teams")
-        return True
-        
+        print(f"   - Home: {len(payload['home'])} teams")
+        print(f"   - Away: {len(payload['away'])} teams")
+        print(f"   - Overall: {len(payload['overall'])} teams")
+    elif filename == 'team-rankings.json':
+        print(f"✅ Exported team rankings to data/team-rankings.json")
+        print(f"   - Attack rankings: {len(payload['attack'])} teams")
+        print(f"   - Defense rankings: {len(payload['defense'])} teams")
+    else:
+        label = filename.replace('.json', '')
+        print(f"✅ Exported {len(payload['data'])} {label} to data/{filename}")
+
+def after_export(filename, payload):
+    """Extra outputs derived from an exported payload"""
+    if filename == 'players.json':
+        # Columnar snapshot for analytics (memory-mappable, typed columns)
+        export_players_columnar(payload['data'], payload['last_updated'])
+
+# Output file -> fetch function, in the order they are exported sequentially
+EXPORTS = [
+    ('teams.json', fetch_teams),
+    ('players.json', fetch_players),
+    ('fixtures.json', fetch_fixtures),
+    ('team-stats.json', fetch_team_stats),
+    ('team-rankings.json', fetch_team_rankings),
+]
+
+def run_after_export(filename, payload):
+    """Summary and after-export hooks for a written file; returns the hook seconds"""
+    summarize_export(filename, payload)
+    started = time.perf_counter()
+    after_export(filename, payload)
+    return time.perf_counter() - started
+
+def export_file_timed(filename, fetch):
+    """Fetch, encode and write a single data file: (ok, export seconds, hook seconds)"""
+    started = time.perf_counter()
+    try:
+        payload = fetch()
+        write_json_file(filename, encode_json(payload))
+        seconds = time.perf_counter() - started
+        return True, seconds, run_after_export(filename, payload)
     except Exception as e:
-        print(f"❌ Error exporting team stats: {e}")
-        return False
+        print(f"❌ Error exporting {filename}: {e}")
+        return False, time.perf_counter() - started, 0.0
+
+def export_file(filename, fetch):
+    """Fetch, encode and write a single data file"""
+    return export_file_timed(filename, fetch)[0]
+
+def export_teams():
+    """Export teams data"""
+    return export_file('teams.json', fetch_teams)
+
+def export_players():
+    """Export players data"""
+    return export_file('players.json', fetch_players)
+
+def export_fixtures():
+    """Export fixtures data"""
+    return export_file('fixtures.json', fetch_fixtures)
+
+def export_team_stats():
+    """Export team stats for all locations"""
+    return export_file('team-stats.json', fetch_team_stats)
 
 def export_team_rankings():
     """Export team rankings"""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Calculate attack rankings
-        cursor.execute("""
-            SELECT 
-                ts.team_id,
-                ts.team_name,
-                (0.7 * ts.goals_scored + 0.3 * ts.expected_goals) / NULLIF(ts.games_played, 0) as weighted_score
-            FROM team_stats_overall ts
-            WHERE ts.games_played > 0
-            ORDER BY (0.7 * ts.goals_scored + 0.3 * ts.expected_goals) / NULLIF(ts.games_played, 0) DESC
-        """)
-        
-        attack_rankings = []
-        for i, stat in enumerate(cursor.fetchall()):
-            attack_rankings.append({
-                'team_id': stat['team_id'],
-                'team_name': stat['team_name'],
-                'rank': i + 1,
-                'weighted_score': float(stat['weighted_score']) if stat['weighted_score'] else 0
-            })
-        
-        # Calculate defense rankings
-        cursor.execute("""
-            SELECT 
-                ts.team_id,
-                ts.team_name,
-                (0.6 * ts.goals_conceded + 0.2 * ts.expected_goals_conceded) / NULLIF(ts.games_played, 0) - (0.2 * ts.clean_sheets) as weighted_score
-            FROM team_stats_overall ts
-            WHERE ts.games_played > 0
-            ORDER BY (0.6 * ts.goals_conceded + 0.2 * ts.expected_goals_conceded) / NULLIF(ts.games_played, 0) - (0.2 * ts.clean_sheets) ASC
-        """)
-        
-        defense_rankings = []
-        for i, stat in enumerate(cursor.fetchall()):
-            defense_rankings.append({
-                'team_id': stat['team_id'],
-                'team_name': stat['team_name'],
-                'rank': i + 1,
-                'weighted_score': float(stat['weighted_score']) if stat['weighted_score'] else 0
-            })
-        
-        cursor.close()
-        conn.close()
-        
-        rankings = {
-            'last_updated': datetime.now().isoformat(),
-            'attack': attack_rankings,
-            'defense': defense_rankings
-        }
-        
-        with open('data/team-rankings.json', 'w') as f:
-            json.dump(rankings, f, indent=2)
-        
-        print(f"✅ Exported team rankings to data/team-rankings.json")
-        print(f"   - Attack rankings: {len(attack_rankings)} teams")
-        print(f"   - Defense rankings: {len(defense_rankings)} teams")
-        return True
-        
-    except Exception as e:
-        print(f"❌ Error exporting team rankings: {e}")
-        return False
+    return export_file('team-rankings.json', fetch_team_rankings)
+
+def export_sequential():
+    """Export every file one after another, returning {filename: (ok, seconds, hook seconds)}"""
+    return {filename: export_file_timed(filename, fetch) for filename, fetch in EXPORTS}
+
+def export_parallel(max_workers=None):
+    """Export every file concurrently, returning {filename: (ok, seconds, hook seconds)}
+
+    Queries run on a thread pool (they wait on PostgreSQL, not the GIL), and
+    each result is handed to a process pool for JSON encoding as soon as it
+    arrives, so the stage takes about as long as the slowest file. A file's
+    time is measured inside its own task, from fetch to write, so it doesn't
+    include waiting on other files; after-export hooks are timed separately.
+    """
+    max_workers = max_workers or len(EXPORTS)
+    results = {}
+    started = {}
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as threads, \
+         ProcessPoolExecutor(max_workers=min(max_workers, os.cpu_count() or 1)) as processes:
+        
+        def run(filename, fetch):
+            started[filename] = time.perf_counter()
+            payload = fetch()
+            content = processes.submit(encode_json, payload).result()
+            write_json_file(filename, content)
+            return payload, time.perf_counter() - started[filename]
+        
+        futures = {threads.submit(run, filename, fetch): filename for filename, fetch in EXPORTS}
+        
+        # Hooks run as files finish, not in submission order
+        for future in as_completed(futures):
+            filename = futures[future]
+            try:
+                payload, seconds = future.result()
+            except Exception as e:
+                print(f"❌ Error exporting {filename}: {e}")
+                results[filename] = (False, time.perf_counter() - started.get(filename, time.perf_counter()), 0.0)
+                continue
+            try:
+                results[filename] = (True, seconds, run_after_export(filename, payload))
+            except Exception as e:
+                print(f"❌ Error in after-export for {filename}: {e}")
+                results[filename] = (False, seconds, 0.0)
+    
+    return results
 
 def main():
     """Main export function"""
+    parser = argparse.ArgumentParser(description='Export FPL data from PostgreSQL to data/*.json')
+    parser.add_argument('--parallel', action='store_true', help='export all files concurrently')
+    parser.add_argument('--workers', type=int, default=None, help='worker count for --parallel')
+    parser.add_argument('--rankings-from-stats', action='store_true',
+                        help='only rebuild team-rankings.json from data/team-stats.json (no database needed)')
+    args = parser.parse_args()
+    
+    if args.rankings_from_stats:
+        return export_file('team-rankings.json', team_rankings_from_stats)
+    
     print("📊 Exporting FPL data to JSON files...")
     print("=" * 50)
     
     # Create data directory
     os.makedirs('data', exist_ok=True)
     
-    # Export all data
-    success_count = 0
-    total_exports = 5
-    
-    if export_teams():
-        success_count += 1
-    
-    if export_players():
-        success_count += 1
-    
-    if export_fixtures():
-        success_count += 1
-    
-    if export_team_stats():
-        success_count += 1
+    stage_started = time.perf_counter()
+    if args.parallel:
+        results = export_parallel(args.workers)
+    else:
+        results = export_sequential()
+    stage_seconds = time.perf_counter() - stage_started
     
-    if export_team_rankings():
-        success_count += 1
+    success_count = sum(1 for ok, _, _ in results.values() if ok)
+    total_exports = len(EXPORTS)
     
     print("=" * 50)
+    print("⏱️  Per-file wall time:")
+    for filename, _ in EXPORTS:
+        ok, seconds, hook_seconds = results[filename]
+        hooks = f" (+{hook_seconds:.2f}s after-export)" if hook_seconds else ""
+        print(f"   {'✅' if ok else '❌'} {filename}: {seconds:.2f}s{hooks}")
+    print(f"   Total: {stage_seconds:.2f}s ({'parallel' if args.parallel else 'sequential'})")
+    
     print(f"✅ Export complete: {success_count}/{total_exports} successful")
     
     if success_count == total_exports:
@@ -432,4 +426,4 @@ def main():
         print("⚠️  Some exports failed. Check the errors above.")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
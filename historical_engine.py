@@ -0,0 +1,730 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from columnar_export import export_player_history_columnar
+from csv_columns import DEFAULT_CHUNK_SIZE, GAMEWEEK_SCHEMA, column_indexes, iter_raw_range, read_header, split_ranges, typed_columns
+from data_store import data_path
+from history_store import get_player_history, read_all_history, read_history_players, read_manifest, update_history_shards, write_history_shards
+from identity_registry import CURRENT_SEASON, cross_season_mapping, load_registry, load_teams_csv, register_players, register_teams, save_registry
+from last_meetings import LAST_MEETINGS_FILE, export_last_meetings, load_current_player_names, update_last_meetings
+from player_identity import build_name_mapping, load_players_csv, report_ambiguous
+
+# Historical processing engine.
+#
+# One pipeline builds data/player-history.json from a past season's gameweek
+# stats:
+#
+#   source  -> byte range of gameweek rows
+#   matcher -> historical player ID -> current player ID
+#   aggregate (rows parsed, matched and grouped by current player and
+#              opponent team code, per byte range; in parallel with --workers)
+#   merge into the existing history (only rows past the gameweek watermark,
+#         read from the byte offset where the last run stopped)
+#   sinks   -> player-history.json, sharded player-history/, player-history.col,
+#              last-meetings.json (incremental runs update only the players
+#              they touch in the shards and last-meetings.json; the JSON and
+#              columnar snapshots are rewritten from the shards)
+#
+# Sources, matchers and sinks are plain functions registered in SOURCES,
+# MATCHERS and SINKS, so alternatives can be added and compared with the
+# benchmark command without forking the pipeline.
+
+HISTORY_FILE = 'data/player-history.json'
+STATE_FILE = 'data/player-history-state.json'
+
+# Season of the gameweek stats being processed (the watermark is per season)
+HISTORY_SEASON = '2024'
+
+DEFAULT_CONFIG = {
+    'historical_players': '~/Desktop/players.csv',
+    'current_players': '~/Desktop/players_2025.csv',
+    'gameweek_stats': '~/Desktop/player_gameweek_stats.csv',
+    'historical_teams': f'data/teams_{HISTORY_SEASON}.csv',
+    'current_teams': f'data/teams_{CURRENT_SEASON}.csv',
+    'source': 'csv',
+    'matcher': 'registry',
+    # None: every sink
+    'sinks': None,
+    'chunk_size': DEFAULT_CHUNK_SIZE,
+    'full': False,
+    'persist': True,
+    'workers': 1,
+    'memory_budget_mb': 256,
+}
+
+# Numeric gameweek columns copied straight from the typed chunks
+STAT_COLUMNS = [name for name, column_type in GAMEWEEK_SCHEMA if column_type in ('int32', 'float64')]
+
+# Sources: source(config) -> {'path', 'header', 'start', 'end'}, the byte range
+# of the gameweek rows; segments of it are parsed by process_segment()
+
+def csv_source(config):
+    """Gameweek stats CSV, as the byte range of its data rows"""
+    path = os.path.expanduser(config['gameweek_stats'])
+    header, start = read_header(path)
+    return {'path': path, 'header': header, 'start': start, 'end': os.path.getsize(path)}
+
+SOURCES = {
+    'csv': csv_source,
+}
+
+def load_context(config):
+    """Load both seasons' teams and players"""
+    historical_teams = {row['id']: row for row in load_teams_csv(config['historical_teams'])}
+    current_teams = {row['code']: row for row in load_teams_csv(config['current_teams'])}
+    return {
+        'historical_teams': historical_teams,
+        'current_teams': current_teams,
+        'historical_players': load_players_csv(os.path.expanduser(config['historical_players'])),
+        'current_players': load_players_csv(os.path.expanduser(config['current_players'])),
+    }
+
+# Matchers: matcher(context, config) -> (name_mapping, ambiguous)
+
+def registry_matcher(context, config):
+    """Map through the identity registry; only unseen players are resolved by name"""
+    registry = load_registry()
+    register_teams(registry, HISTORY_SEASON, context['historical_teams'].values())
+    register_teams(registry, CURRENT_SEASON, context['current_teams'].values())
+    register_players(registry, CURRENT_SEASON, context['current_players'])
+    _, ambiguous = register_players(registry, HISTORY_SEASON, context['historical_players'])
+    if config['persist']:
+        save_registry(registry)
+
+    # Report candidates by their current names
+    candidates = {key: registry['players'][key] for keys in ambiguous.values() for key in keys}
+    context['ambiguous_candidates'] = candidates
+    return cross_season_mapping(registry, HISTORY_SEASON, CURRENT_SEASON), ambiguous
+
+def name_matcher(context, config):
+    """Resolve every player by name through the shared index (no registry)"""
+    context['ambiguous_candidates'] = context['current_players']
+    return build_name_mapping(
+        context['historical_players'], context['current_players'],
+        {team_id: team['code'] for team_id, team in context['historical_teams'].items()},
+        {team['id']: code for code, team in context['current_teams'].items()}
+    )
+
+MATCHERS = {
+    'registry': registry_matcher,
+    'name': name_matcher,
+}
+
+# Rough size of one aggregated fixture (dict plus values) in a worker, used to
+# turn the memory budget into rows per chunk
+ROW_BYTES = 2048
+
+# Byte ranges per worker: enough that a slow range doesn't idle the others
+SEGMENTS_PER_WORKER = 4
+
+# Columns a history fixture is built from (typed only for rows that are kept)
+FIXTURE_SCHEMA = [(name, column_type) for name, column_type in GAMEWEEK_SCHEMA if name in STAT_COLUMNS or name == 'was_home']
+
+def history_fixture(columns, i):
+    """Fixture entry as stored in player-history.json, from row i of a chunk"""
+    fixture = {name: columns[name][i] for name in STAT_COLUMNS}
+    fixture['was_home'] = bool(columns['was_home'][i])
+    return fixture
+
+def build_lookups(context, name_mapping, source):
+    """Everything a segment needs to match rows, keyed by the raw CSV strings
+
+    players: historical player ID -> (current player ID, web name)
+    teams: historical team ID -> team code, or None for teams not in the
+    current league (their codes are in missing_teams, to be reported)
+    """
+    current_players = context['current_players']
+    current_teams = context['current_teams']
+    players = {}
+    for historical_player_id, current_player_id in name_mapping.items():
+        current_player = current_players.get(current_player_id)
+        if current_player:
+            players[historical_player_id] = (current_player_id, current_player['web_name'])
+
+    # Use team code (stable identifier); opponents not in the current league are dropped
+    teams = {}
+    missing_teams = {}
+    for team_id, team in context['historical_teams'].items():
+        if team['code'] in current_teams:
+            teams[team_id] = team['code']
+        else:
+            teams[team_id] = None
+            if team['code']:
+                missing_teams[team_id] = team['code']
+
+    indexes = dict(zip([name for name, _ in GAMEWEEK_SCHEMA], column_indexes(source['path'], source['header'], GAMEWEEK_SCHEMA)))
+    return {
+        'players': players,
+        'teams': teams,
+        'missing_teams': missing_teams,
+        'indexes': indexes,
+        'width': max(indexes.values()) + 1,
+        'fixture_indexes': [indexes[name] for name, _ in FIXTURE_SCHEMA],
+    }
+
+def current_rss_mb():
+    """Resident memory of this process in MB (peak where the current value is unavailable)"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return peak_rss_mb()
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB (0 where unavailable)"""
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def process_segment(lookups, path, start, end, after_gameweek, chunk_rows, memory_budget_mb=None):
+    """Parse, match and aggregate the gameweek rows in bytes [start, end) of the source
+
+    Rows up to the watermark and unmatched rows are dropped on their raw
+    strings, so only kept rows are converted to typed columns. Returns
+    {'stats', 'counts', 'missing_codes', 'last_gameweek', 'gameweek_marks',
+    'in_order', 'next_offset'} where stats maps (current player ID, opponent
+    code) to (player name, [fixtures]) in source order, gameweek_marks holds
+    (gameweek, byte offset) wherever the gameweek changes and in_order says
+    whether gameweeks never went down. With memory_budget_mb the segment stops after the first
+    chunk that leaves this process above the budget; next_offset is then where
+    the rest of the range starts (None when the range is done).
+    """
+    players = lookups['players']
+    teams = lookups['teams']
+    missing_teams = lookups['missing_teams']
+    player_index = lookups['indexes']['player_id']
+    team_index = lookups['indexes']['opponent_team']
+    gameweek_index = lookups['indexes']['gameweek']
+    width = lookups['width']
+
+    stats = {}
+    counts = defaultdict(int)
+    missing_codes = set()
+    last_gameweek = 0
+    gameweek_marks = []
+    in_order = True
+    next_offset = None
+
+    for rows, row_offsets, offset in iter_raw_range(path, start, end, chunk_rows):
+        kept = []
+        keys = []
+        for row, row_offset in zip(rows, row_offsets):
+            if len(row) < width:
+                row = row + [''] * (width - len(row))
+            gameweek = int(row[gameweek_index] or 0)
+            if not gameweek_marks or gameweek != gameweek_marks[-1][0]:
+                in_order = in_order and (not gameweek_marks or gameweek > gameweek_marks[-1][0])
+                gameweek_marks.append((gameweek, row_offset))
+            last_gameweek = max(last_gameweek, gameweek)
+            if gameweek <= after_gameweek:
+                counts['skipped'] += 1
+                continue
+            player = players.get(row[player_index])
+            team_id = row[team_index]
+            team_code = teams.get(team_id)
+            if team_id in missing_teams:
+                missing_codes.add(missing_teams[team_id])
+            if player is None or team_code is None:
+                counts['unmatched'] += 1
+                continue
+            kept.append(row)
+            keys.append((player, team_code))
+
+        columns = typed_columns(kept, FIXTURE_SCHEMA, lookups['fixture_indexes'])
+        for i, ((current_player_id, player_name), team_code) in enumerate(keys):
+            key = (current_player_id, team_code)
+            if key not in stats:
+                stats[key] = (player_name, [])
+            stats[key][1].append(history_fixture(columns, i))
+        counts['matched'] += len(kept)
+
+        if memory_budget_mb and offset < end and current_rss_mb() > memory_budget_mb:
+            next_offset = offset
+            break
+
+    return {
+        'stats': stats,
+        'counts': dict(counts),
+        'missing_codes': missing_codes,
+        'last_gameweek': last_gameweek,
+        'gameweek_marks': gameweek_marks,
+        'in_order': in_order,
+        'next_offset': next_offset,
+    }
+
+def _merge_segment(total, segment):
+    """Append a segment's results to the running totals (segments arrive in source order)"""
+    stats = total['stats']
+    for key, (player_name, fixtures) in segment['stats'].items():
+        if key in stats:
+            stats[key][1].extend(fixtures)
+        else:
+            stats[key] = (player_name, fixtures)
+    for name, count in segment['counts'].items():
+        total['counts'][name] += count
+    total['missing_codes'] |= segment['missing_codes']
+    total['last_gameweek'] = max(total['last_gameweek'], segment['last_gameweek'])
+    marks = segment['gameweek_marks']
+    if marks and total['gameweek_marks'] and marks[0][0] < total['gameweek_marks'][-1][0]:
+        total['in_order'] = False
+    total['in_order'] = total['in_order'] and segment['in_order']
+    total['gameweek_marks'].extend(marks)
+
+def _new_total(after_gameweek):
+    return {
+        'stats': {}, 'counts': defaultdict(int), 'missing_codes': set(), 'last_gameweek': after_gameweek,
+        'gameweek_marks': [], 'in_order': True
+    }
+
+def _result(total):
+    _report_missing_codes(total)
+    marks = total['gameweek_marks'] if total['in_order'] else None
+    return total['stats'], total['last_gameweek'], total['counts'], marks
+
+def _report_missing_codes(total):
+    for team_code in sorted(total['missing_codes']):
+        print(f"⚠️  Team code {team_code} is not in the {CURRENT_SEASON} league, skipping its fixtures")
+
+def aggregate(source, lookups, after_gameweek=0, chunk_rows=DEFAULT_CHUNK_SIZE):
+    """Group gameweek rows by (current player ID, opponent team code)
+
+    Only rows after the after_gameweek watermark are kept. Returns
+    (processed_stats, last_gameweek, counts, gameweek_marks) where
+    processed_stats maps the key to (player name, [fixtures]) in source order,
+    last_gameweek is the highest gameweek read and gameweek_marks lists
+    (gameweek, byte offset) where each gameweek starts, or is None when the
+    source isn't ordered by gameweek.
+    """
+    total = _new_total(after_gameweek)
+    _merge_segment(total, process_segment(lookups, source['path'], source['start'], source['end'], after_gameweek, chunk_rows))
+    return _result(total)
+
+# Worker state: the lookups are sent once per process, not once per task
+_worker_lookups = {}
+
+def _init_worker(lookups):
+    _worker_lookups.update(lookups)
+
+def _segment_task(path, start, end, after_gameweek, chunk_rows, memory_budget_mb):
+    return process_segment(_worker_lookups, path, start, end, after_gameweek, chunk_rows, memory_budget_mb)
+
+def aggregate_parallel(source, lookups, after_gameweek=0, workers=None, memory_budget_mb=256, chunk_rows=DEFAULT_CHUNK_SIZE):
+    """aggregate() with the source split into byte ranges across a process pool
+
+    Each worker reads, parses, matches and aggregates its own range, so the
+    parent only merges results. Ranges are merged in source order, which
+    makes the result identical to aggregate(). Workers keep to the memory
+    budget: chunks are at most chunk_rows rows, and a worker that is over
+    budget after a chunk hands back what it has and where it stopped; the
+    rest of its range is queued as a new task right after it.
+    """
+    workers = workers or os.cpu_count() or 1
+    path = source['path']
+    total = _new_total(after_gameweek)
+    queue = deque(split_ranges(path, source['start'], source['end'], workers * SEGMENTS_PER_WORKER))
+    pending = deque()
+    resumed = 0
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(lookups,)) as executor:
+        def submit(start, end):
+            return end, executor.submit(_segment_task, path, start, end, after_gameweek, chunk_rows, memory_budget_mb)
+
+        while queue or pending:
+            # At most two ranges per worker in flight
+            while queue and len(pending) < workers * 2:
+                pending.append(submit(*queue.popleft()))
+            end, future = pending.popleft()
+            segment = future.result()
+            _merge_segment(total, segment)
+            if segment['next_offset'] is not None:
+                resumed += 1
+                pending.appendleft(submit(segment['next_offset'], end))
+
+    if resumed:
+        print(f"⚙️  {resumed} ranges were split to keep workers within {memory_budget_mb} MB")
+    return _result(total)
+
+def task_rows(memory_budget_mb, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Rows per chunk so that one chunk stays well within the memory budget"""
+    return max(1000, min(chunk_size, int(memory_budget_mb * 1024 * 1024 // ROW_BYTES)))
+
+def merge_history(history_data, processed_stats):
+    """Upsert fixtures into the affected (player, opponent code) entries
+
+    Fixtures of a gameweek that is read again (one that was still landing on
+    the last run) replace the stored ones instead of being added twice.
+    Players sharing a web name share an entry; their fixtures are merged in
+    player ID order so ties sort the same on every run. Returns the players
+    whose history changed.
+    """
+    updates = {}
+    for (player_id, team_code), (player_name, fixtures) in processed_stats.items():
+        updates.setdefault((player_name, team_code), []).append((player_id, fixtures))
+
+    touched = {}
+    for (player_name, team_code), parts in updates.items():
+        entry = history_data.setdefault(player_name, {}).setdefault(team_code, {
+            'fixtures': [],
+            'is_new_player': False
+        })
+        fixtures = [fixture for _, part in sorted(parts, key=lambda part: part[0]) for fixture in part]
+        gameweeks = {fixture['gameweek'] for fixture in fixtures}
+        merged = [fixture for fixture in entry['fixtures'] if fixture['gameweek'] not in gameweeks] + fixtures
+        merged.sort(key=lambda fixture: fixture['gameweek'])
+        if merged != entry['fixtures']:
+            entry['fixtures'] = merged
+            touched[player_name] = history_data[player_name]
+    return touched
+
+# Sinks: sink(history_data, last_updated, config, touched=None)
+#
+# A full build passes the whole history and touched=None. An incremental build
+# also passes the players it touched: shards and last_meetings update just
+# those entries, while the full-snapshot sinks (json, columnar) write the whole
+# history, read back from the shards with the touched players applied, so
+# every output stays at the same watermark. history_data is None when no sink
+# that runs needs it.
+
+# Sinks that always write the whole history
+FULL_SNAPSHOT_SINKS = ['json', 'columnar']
+
+def load_full_history(touched):
+    """The whole history from the shards, with the touched players applied (before they're written)"""
+    history_data = read_all_history()
+    history_data.update(touched)
+    return history_data
+
+def json_sink(history_data, last_updated, config, touched=None):
+    """data/player-history.json, the full snapshot (exported to CSV, fallback for the API)"""
+    output_data = {
+        'last_updated': last_updated,
+        'data': history_data
+    }
+    with open(HISTORY_FILE, 'w') as f:
+        json.dump(output_data, f, indent=2)
+    print(f"📁 Saved {len(history_data)} players to {HISTORY_FILE}")
+
+def shards_sink(history_data, last_updated, config, touched=None):
+    """Hash-bucketed shards in data/player-history/, read lazily by the API"""
+    if touched is None:
+        write_history_shards(history_data, last_updated)
+    else:
+        update_history_shards(touched, last_updated)
+
+def columnar_sink(history_data, last_updated, config, touched=None):
+    """Columnar snapshot for analytics (memory-mappable, typed columns)"""
+    export_player_history_columnar(history_data, last_updated)
+
+def last_meetings_sink(history_data, last_updated, config, touched=None):
+    """One-request table for the planner's "Last" view"""
+    current_players = load_current_player_names()
+    if touched is not None and os.path.exists(data_path(LAST_MEETINGS_FILE)):
+        update_last_meetings(touched, last_updated, current_players)
+    else:
+        export_last_meetings(history_data, last_updated, current_players)
+
+SINKS = {
+    'json': json_sink,
+    'shards': shards_sink,
+    'columnar': columnar_sink,
+    'last_meetings': last_meetings_sink,
+}
+
+# State: {'seasons': {season: {'gameweek', 'offset', 'tail_sha256'}}}
+#
+# gameweek is the last complete gameweek processed: the newest gameweek in the
+# file may still be landing, so it is read again (and replaces what was
+# stored) until a later one appears. offset is where the first row after it
+# starts in the gameweek stats file (when the file is ordered by
+# gameweek), so the next run seeks there instead of re-reading old rows;
+# tail_sha256 hashes the TAIL_BYTES before it, and a file that was rewritten
+# rather than appended to is read from the top again.
+
+TAIL_BYTES = 4096
+
+def load_history_state(full=False):
+    """Load the watermark state, or start empty (full rebuild or no sharded store yet)"""
+    if full or read_manifest() is None or not os.path.exists(STATE_FILE):
+        return {'seasons': {}}
+    with open(STATE_FILE, 'r') as f:
+        state = json.load(f)
+    # Older state files only hold the gameweek
+    state['seasons'] = {
+        season: value if isinstance(value, dict) else {'gameweek': value}
+        for season, value in state.get('seasons', {}).items()
+    }
+    return state
+
+def save_history_state(state):
+    """Save the processed-gameweek watermark"""
+    state['last_updated'] = datetime.now().isoformat()
+    with open(STATE_FILE, 'w') as f:
+        json.dump(state, f, indent=2)
+
+def tail_digest(path, start, offset):
+    """sha256 of the TAIL_BYTES before offset (not before start, the first data row)"""
+    tail_start = max(start, offset - TAIL_BYTES)
+    with open(path, 'rb') as f:
+        f.seek(tail_start)
+        return hashlib.sha256(f.read(offset - tail_start)).hexdigest()
+
+def resume_offset(source, season_state):
+    """Where to start reading: the saved offset if the file still has the same bytes before it"""
+    offset = season_state.get('offset')
+    if not offset or not source['start'] < offset <= source['end']:
+        return source['start']
+    if tail_digest(source['path'], source['start'], offset) != season_state.get('tail_sha256'):
+        print("⚠️  Gameweek stats changed before the saved offset, reading from the top")
+        return source['start']
+    return offset
+
+def complete_gameweek(last_gameweek, watermark):
+    """Last gameweek whose rows have all landed (the newest may still be arriving)"""
+    return max(watermark, last_gameweek - 1)
+
+def next_offset(source, gameweek_marks, gameweek, offset):
+    """Start of the first row after gameweek; offset again when the source isn't ordered"""
+    if gameweek_marks is None:
+        return offset
+    return next((mark for mark_gameweek, mark in gameweek_marks if mark_gameweek > gameweek), source['end'])
+
+def build(config):
+    """Create or incrementally update the player history
+
+    Gameweeks up to the watermark in data/player-history-state.json are
+    already in the sharded store. Reading resumes at the saved byte offset,
+    rows up to the watermark are dropped before they are typed, and only the
+    players the new rows touch are read from and written back to the shards
+    and last-meetings.json; player-history.json and player-history.col are
+    rewritten from the updated store so every output matches. full=True
+    rebuilds everything (needed after the player mapping changes).
+    """
+    print(f"\n🔍 Loading {HISTORY_SEASON} and {CURRENT_SEASON} teams and players...")
+    context = load_context(config)
+    print(f"✅ Loaded {len(context['historical_teams'])}/{len(context['current_teams'])} teams "
+          f"and {len(context['historical_players'])}/{len(context['current_players'])} players")
+
+    print(f"\n🔍 Mapping players ({config['matcher']} matcher)...")
+    name_mapping, ambiguous = MATCHERS[config['matcher']](context, config)
+    print(f"✅ Mapped {len(name_mapping)} players")
+    report_ambiguous(ambiguous, context['historical_players'], context['ambiguous_candidates'])
+
+    state = load_history_state(config['full'])
+    incremental = bool(state['seasons'])
+    season_state = state['seasons'].get(HISTORY_SEASON, {})
+    watermark = season_state.get('gameweek', 0)
+    sinks = config['sinks'] or list(SINKS)
+
+    whole_source = SOURCES[config['source']](config)
+    start = resume_offset(whole_source, season_state)
+    source = {**whole_source, 'start': start}
+    lookups = build_lookups(context, name_mapping, source)
+
+    print(f"\n🔍 Processing gameweek stats after GW{watermark} (from byte {start})...")
+    if config['workers'] > 1:
+        chunk_rows = task_rows(config['memory_budget_mb'], config['chunk_size'])
+        print(f"⚙️  {config['workers']} workers, {chunk_rows} rows per chunk ({config['memory_budget_mb']} MB budget)")
+        processed_stats, last_gameweek, counts, gameweek_marks = aggregate_parallel(
+            source, lookups, watermark, config['workers'], config['memory_budget_mb'], chunk_rows
+        )
+    else:
+        processed_stats, last_gameweek, counts, gameweek_marks = aggregate(source, lookups, watermark, config['chunk_size'])
+    print(f"✅ Processed {counts['matched']} records")
+    print(f"❌ Unmatched {counts['unmatched']} records")
+    if counts['skipped']:
+        print(f"⏭️  Skipped {counts['skipped']} records up to GW{watermark}")
+
+    if incremental:
+        touched = merge_history(read_history_players({name for name, _ in processed_stats.values()}), processed_stats)
+        if not touched:
+            print(f"✅ Player history is up to date (GW{watermark})")
+            return
+        print(f"✅ Updated {len(processed_stats)} player/opponent entries for {len(touched)} players")
+        needs_full = any(sink in FULL_SNAPSHOT_SINKS for sink in sinks) or (
+            'last_meetings' in sinks and not os.path.exists(data_path(LAST_MEETINGS_FILE))
+        )
+        history_data = load_full_history(touched) if needs_full else None
+    else:
+        history_data = {}
+        touched = None
+        merge_history(history_data, processed_stats)
+        print(f"✅ Updated {len(processed_stats)} player/opponent entries, {len(history_data)} players in total")
+
+    last_updated = datetime.now().isoformat()
+    for sink in sinks:
+        SINKS[sink](history_data, last_updated, config, touched)
+
+    if 'shards' in sinks:
+        gameweek = complete_gameweek(last_gameweek, watermark)
+        offset = next_offset(source, gameweek_marks, gameweek, start)
+        state['seasons'][HISTORY_SEASON] = {
+            'gameweek': gameweek,
+            'offset': offset,
+            'tail_sha256': tail_digest(source['path'], whole_source['start'], offset)
+        }
+        save_history_state(state)
+        print(f"📌 Watermark: {HISTORY_SEASON} GW{gameweek} (byte {offset})")
+
+def verify():
+    """Spot-check the built history for a few well-known players (read as the API does)"""
+    print("\n🔍 Verifying data...")
+
+    for player in ['M.Salah', 'Luis Díaz', 'Haaland']:
+        opponents = get_player_history(player)
+        if opponents:
+            fixtures_count = sum(len(data['fixtures']) for data in opponents.values())
+            print(f"✅ {player}: {fixtures_count} fixtures found")
+        else:
+            print(f"❌ {player}: Not found")
+
+    # Opponents are keyed by team code
+    test_cases = [
+        ('M.Salah', '91', 'Bournemouth'),
+        ('Luis Díaz', '91', 'Bournemouth'),
+        ('Haaland', '14', 'Liverpool')
+    ]
+    for player_name, team_code, team_name in test_cases:
+        fixtures = (get_player_history(player_name) or {}).get(team_code, {}).get('fixtures')
+        if fixtures:
+            max_points = max(f['total_points'] for f in fixtures)
+            print(f"✅ {player_name} vs {team_name}: {len(fixtures)} fixtures, max {max_points} points")
+        else:
+            print(f"❌ {player_name} vs {team_name}: Not found")
+
+def benchmark(config, chunk_sizes, repeat=3, worker_counts=(1,)):
+    """Time each pipeline stage for every matcher, chunk size and worker count (best of repeat)
+
+    Nothing is written: the registry is not saved and sinks are not run; the
+    JSON encode is timed in memory.
+    """
+    config = {**config, 'persist': False}
+    results = []
+
+    def best_time(fn):
+        best, value = None, None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            value = fn()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, value
+
+    load_time, context = best_time(lambda: load_context(config))
+    results.append(('load', '-', '-', load_time))
+
+    for matcher_name, matcher in MATCHERS.items():
+        match_time, (name_mapping, _) = best_time(lambda: matcher(context, config))
+        results.append(('match', matcher_name, '-', match_time))
+
+        source = SOURCES[config['source']](config)
+        lookups = build_lookups(context, name_mapping, source)
+        for chunk_size in chunk_sizes:
+            aggregate_time, (processed_stats, _, _, _) = best_time(
+                lambda: aggregate(source, lookups, chunk_rows=chunk_size)
+            )
+            results.append(('aggregate', matcher_name, chunk_size, aggregate_time))
+
+            for workers in worker_counts:
+                if workers <= 1:
+                    continue
+                parallel_time, _ = best_time(lambda: aggregate_parallel(
+                    source, lookups, workers=workers, memory_budget_mb=config['memory_budget_mb'],
+                    chunk_rows=task_rows(config['memory_budget_mb'], chunk_size)
+                ))
+                results.append((f'agg x{workers}', matcher_name, chunk_size, parallel_time))
+
+        def merge_into_empty():
+            history_data = {}
+            merge_history(history_data, processed_stats)
+            return history_data
+
+        merge_time, history_data = best_time(merge_into_empty)
+        results.append(('merge', matcher_name, '-', merge_time))
+        encode_time, _ = best_time(lambda: json.dumps({'data': history_data}, indent=2))
+        results.append(('encode', matcher_name, '-', encode_time))
+
+    print(f"\n⏱️  Historical engine benchmark (best of {repeat})")
+    print(f"{'stage':<10} {'matcher':<10} {'chunk':>8} {'seconds':>10}")
+    for stage, matcher_name, chunk_size, elapsed in results:
+        print(f"{stage:<10} {matcher_name:<10} {str(chunk_size):>8} {elapsed:>10.4f}")
+    return results
+
+def main(argv=None):
+    """Historical engine CLI: build, verify or benchmark"""
+    parser = argparse.ArgumentParser(description='Build data/player-history.json from historical gameweek stats')
+    subparsers = parser.add_subparsers(dest='command')
+
+    def add_input_args(subparser):
+        subparser.add_argument('--historical-players', default=DEFAULT_CONFIG['historical_players'])
+        subparser.add_argument('--current-players', default=DEFAULT_CONFIG['current_players'])
+        subparser.add_argument('--gameweek-stats', default=DEFAULT_CONFIG['gameweek_stats'])
+        subparser.add_argument('--source', choices=sorted(SOURCES), default=DEFAULT_CONFIG['source'])
+
+    build_parser = subparsers.add_parser('build', help='create or update the player history (default)')
+    add_input_args(build_parser)
+    build_parser.add_argument('--full', action='store_true',
+                              help='reprocess every gameweek instead of only those after the watermark')
+    build_parser.add_argument('--matcher', choices=sorted(MATCHERS), default=DEFAULT_CONFIG['matcher'])
+    build_parser.add_argument('--sink', dest='sinks', action='append', choices=sorted(SINKS),
+                              help='output to write (repeatable, default: all)')
+    build_parser.add_argument('--chunk-size', type=int, default=DEFAULT_CONFIG['chunk_size'])
+    build_parser.add_argument('--workers', type=int, default=DEFAULT_CONFIG['workers'],
+                              help='aggregate in a process pool, one byte range of the CSV per task (0 = one per core)')
+    build_parser.add_argument('--memory-budget-mb', type=int, default=DEFAULT_CONFIG['memory_budget_mb'],
+                              help='per-worker memory budget; bounds the rows a worker parses per chunk and splits its range when exceeded')
+    build_parser.add_argument('--no-verify', action='store_true', help='skip the spot checks after building')
+
+    subparsers.add_parser('verify', help='spot-check the built player history')
+
+    benchmark_parser = subparsers.add_parser('benchmark', help='time each stage without writing anything')
+    add_input_args(benchmark_parser)
+    benchmark_parser.add_argument('--chunk-sizes', type=int, nargs='+', default=[10000, DEFAULT_CHUNK_SIZE])
+    benchmark_parser.add_argument('--repeat', type=int, default=3)
+    benchmark_parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1],
+                                  help='worker counts to time the parallel aggregation with')
+    benchmark_parser.add_argument('--memory-budget-mb', type=int, default=DEFAULT_CONFIG['memory_budget_mb'])
+
+    # Without a command, arguments are for build (so `--full` alone works)
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] not in subparsers.choices and argv[0] not in ('-h', '--help'):
+        argv = ['build'] + argv
+    args = parser.parse_args(argv)
+    command = args.command
+
+    if command == 'verify':
+        verify()
+        return
+
+    config = {**DEFAULT_CONFIG}
+    for key in ['historical_players', 'current_players', 'gameweek_stats', 'source', 'matcher', 'chunk_size', 'full', 'memory_budget_mb']:
+        if hasattr(args, key):
+            config[key] = getattr(args, key)
+    if getattr(args, 'sinks', None):
+        config['sinks'] = args.sinks
+
+    if command == 'benchmark':
+        benchmark(config, args.chunk_sizes, args.repeat, args.workers)
+        return
+    config['workers'] = args.workers or os.cpu_count() or 1
+
+    print("🚀 BUILDING HISTORICAL DATA WITH TEAM CODES")
+    print("=" * 60)
+    build(config)
+    if not args.no_verify:
+        verify()
+
+    print("\n🎉 HISTORICAL DATA BUILD COMPLETE!")
+    print("📊 Using team codes (stable) instead of team IDs (unstable)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import json
+import os
+import zlib
+from datetime import datetime
+from data_store import data_path, load_data_file, load_data_file_lru
+
+# Sharded player history store.
+#
+# player-history.json has to be parsed whole to answer a question about one
+# player. The store splits the same data into hash buckets on disk:
+#
+#   data/player-history/manifest.json   shard count, player count, last_updated
+#   data/player-history/shard-NN.json   {player_name: {team_code: {fixtures, ...}}}
+#
+# A player always lives in shard crc32(name) % shards, so a lookup reads one
+# small file. The API keeps only recently used shards in memory (data_store's
+# LRU), so memory stays flat as more seasons are added. Incremental builds
+# read and rewrite only the shards of the players they touch.
+HISTORY_DIR = 'player-history'
+MANIFEST_FILE = f'{HISTORY_DIR}/manifest.json'
+DEFAULT_SHARDS = 64
+
+def shard_index(player_name, shards):
+    """Stable shard for a player name"""
+    return zlib.crc32(player_name.encode('utf-8')) % shards
+
+def shard_filename(index):
+    return f'{HISTORY_DIR}/shard-{index:02d}.json'
+
+def _write_json(file_path, payload):
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, separators=(',', ':'), ensure_ascii=False)
+    os.replace(tmp_path, file_path)
+
+def write_history_shards(history_data, last_updated=None, shards=DEFAULT_SHARDS):
+    """Write player history as hash-bucketed shard files plus a manifest"""
+    buckets = [{} for _ in range(shards)]
+    for player_name, opponents in history_data.items():
+        buckets[shard_index(player_name, shards)][player_name] = opponents
+
+    os.makedirs(data_path(HISTORY_DIR), exist_ok=True)
+    for index, bucket in enumerate(buckets):
+        _write_json(data_path(shard_filename(index)), bucket)
+
+    # Manifest last, so readers never see a shard count without its shards
+    _write_json(data_path(MANIFEST_FILE), {
+        'last_updated': last_updated or datetime.now().isoformat(),
+        'shards': shards,
+        'players': len(history_data)
+    })
+    print(f"✅ Wrote {len(history_data)} players to {shards} shards in {data_path(HISTORY_DIR)}")
+
+def read_manifest():
+    """The store's manifest, or None if the sharded store has not been built"""
+    try:
+        with open(data_path(MANIFEST_FILE), 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def _read_shard(index):
+    with open(data_path(shard_filename(index)), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def read_history_players(player_names):
+    """{player_name: {team_code: {fixtures, ...}}} for the names in the store (one read per shard)"""
+    shards = read_manifest()['shards']
+    by_shard = {}
+    for player_name in player_names:
+        by_shard.setdefault(shard_index(player_name, shards), []).append(player_name)
+
+    history_data = {}
+    for index, names in sorted(by_shard.items()):
+        shard = _read_shard(index)
+        history_data.update({name: shard[name] for name in names if name in shard})
+    return history_data
+
+def read_all_history():
+    """The whole store as one {player_name: {team_code: {fixtures, ...}}} dict"""
+    history_data = {}
+    for index in range(read_manifest()['shards']):
+        history_data.update(_read_shard(index))
+    return history_data
+
+def update_history_shards(players, last_updated=None):
+    """Replace these players' entries, rewriting only the shards they live in"""
+    manifest = read_manifest()
+    shards = manifest['shards']
+    by_shard = {}
+    for player_name, opponents in players.items():
+        by_shard.setdefault(shard_index(player_name, shards), {})[player_name] = opponents
+
+    added = 0
+    for index, updates in sorted(by_shard.items()):
+        shard = _read_shard(index)
+        added += sum(1 for player_name in updates if player_name not in shard)
+        shard.update(updates)
+        _write_json(data_path(shard_filename(index)), shard)
+
+    _write_json(data_path(MANIFEST_FILE), {
+        'last_updated': last_updated or datetime.now().isoformat(),
+        'shards': shards,
+        'players': manifest['players'] + added
+    })
+    print(f"✅ Updated {len(players)} players in {len(by_shard)} of {shards} shards in {data_path(HISTORY_DIR)}")
+
+def get_player_history(player_name):
+    """Return {team_code: {fixtures, is_new_player}} for a player, or None if not in the history
+
+    Reads one shard through the LRU; falls back to player-history.json when
+    the sharded store has not been built.
+    """
+    try:
+        manifest = load_data_file(MANIFEST_FILE)
+    except FileNotFoundError:
+        return load_data_file('player-history.json')['data'].get(player_name)
+
+    shard = load_data_file_lru(shard_filename(shard_index(player_name, manifest['shards'])))
+    return shard.get(player_name)
+
+def main():
+    """Shard data/player-history.json into data/player-history/"""
+    print("🚀 Sharding player history...")
+    with open(data_path('player-history.json'), 'r') as f:
+        history = json.load(f)
+    write_history_shards(history['data'], history.get('last_updated'))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+import csv
+import json
+import os
+from datetime import datetime
+from data_store import data_path
+from player_identity import build_player_index, normalize_name, resolve_player
+
+# Cross-season identity registry.
+#
+# FPL renumbers players and teams every season (see data_audit_report.md).
+# The registry in data/identity-registry.json records, for every season we
+# have seen:
+#   teams:    season -> team_id -> team code (stable across seasons)
+#   elements: season -> element_id -> stable player key
+#   players:  player key -> latest names, team code and {season: element_id}
+#
+# Player keys are the FPL player `code` when the source has it (the API does),
+# otherwise the player is resolved by name against players already in the
+# registry, so name matching runs once per new (season, element_id) instead of
+# on every rebuild. The registry is only ever added to; sync updates it in
+# place and the API reads it through data_store.
+REGISTRY_FILE = 'identity-registry.json'
+CURRENT_SEASON = '2025'
+
+def empty_registry():
+    return {
+        'last_updated': None,
+        'teams': {},
+        'elements': {},
+        'players': {}
+    }
+
+def load_registry(file_path=None):
+    """Load the registry from disk, or return an empty one"""
+    file_path = file_path or data_path(REGISTRY_FILE)
+    if not os.path.exists(file_path):
+        return empty_registry()
+    with open(file_path, 'r', encoding='utf-8') as f:
+        registry = json.load(f)
+    for section, value in empty_registry().items():
+        registry.setdefault(section, value)
+    return registry
+
+def save_registry(registry, file_path=None):
+    """Write the registry atomically"""
+    file_path = file_path or data_path(REGISTRY_FILE)
+    registry['last_updated'] = datetime.now().isoformat()
+    os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(registry, f, indent=2, sort_keys=True, ensure_ascii=False)
+    os.replace(tmp_path, file_path)
+    return file_path
+
+def register_teams(registry, season, teams):
+    """Record team_id -> code for a season; returns the number of new or changed entries"""
+    season_teams = registry['teams'].setdefault(str(season), {})
+    changed = 0
+    for team in teams:
+        team_id, code = str(team['id']), str(team['code'])
+        if season_teams.get(team_id) != code:
+            season_teams[team_id] = code
+            changed += 1
+    return changed
+
+def _registered_players_index(registry, season):
+    """Name index over registered players, excluding those already in this season"""
+    season_elements = registry['elements'].get(season, {})
+    taken = set(season_elements.values())
+    candidates = {
+        key: {**player, 'team_id': player.get('team_code')}
+        for key, player in registry['players'].items()
+        if key not in taken
+    }
+    # Candidates carry their team code in team_id, so codes map to themselves
+    team_codes = {player['team_code']: player['team_code'] for player in candidates.values() if player.get('team_code')}
+    return build_player_index(candidates, team_codes)
+
+def register_players(registry, season, players, team_codes=None):
+    """Assign stable keys to a season's players
+
+    players maps element_id -> row with web_name, first_name, second_name,
+    team_id and, when known, the FPL player code. team_codes maps that
+    season's team_id -> team code (defaults to the registered teams). Only
+    element IDs not yet registered for the season are resolved.
+
+    Returns (added, ambiguous) where ambiguous maps element IDs that matched
+    several registered players to the candidate keys. Two elements of a season
+    never share a key: an element whose name match (or name key) is already
+    taken gets its own element-qualified key and is reported as ambiguous, and
+    two elements with the same FPL player code raise ValueError.
+    """
+    season = str(season)
+    team_codes = team_codes or registry['teams'].get(season, {})
+    season_elements = registry['elements'].setdefault(season, {})
+    new_players = {str(element_id): player for element_id, player in players.items() if str(element_id) not in season_elements}
+    claimed = {key: element_id for element_id, key in season_elements.items()}
+
+    index = None
+    added = 0
+    ambiguous = {}
+    for element_id, player in new_players.items():
+        team_code = team_codes.get(str(player.get('team_id')))
+        key = str(player['code']) if player.get('code') else None
+
+        if key is None:
+            if index is None:
+                index = _registered_players_index(registry, season)
+            key, candidates = resolve_player(index, player, team_code)
+            if candidates:
+                ambiguous[element_id] = candidates
+            if key is None:
+                key = f"name:{normalize_name(player.get('web_name'))}:{team_code or ''}"
+
+        if key in claimed:
+            if player.get('code'):
+                raise ValueError(f"Season {season}: elements {claimed[key]} and {element_id} share player code {key}")
+            # Same match or name key as another element this season: keep them apart
+            ambiguous.setdefault(element_id, [key])
+            key = f"name:{normalize_name(player.get('web_name'))}:{team_code or ''}:{element_id}"
+        claimed[key] = element_id
+
+        season_elements[element_id] = key
+        entry = registry['players'].setdefault(key, {'seasons': {}})
+        entry['seasons'][season] = element_id
+        if season >= max(entry['seasons']):
+            entry.update({
+                'web_name': player.get('web_name', ''),
+                'first_name': player.get('first_name', ''),
+                'second_name': player.get('second_name', ''),
+                'team_code': team_code
+            })
+        added += 1
+    return added, ambiguous
+
+def load_teams_csv(path):
+    """Load a season's teams CSV as a list of rows"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+def build_lookup(registry):
+    """Flatten the registry into dicts keyed by (season, id) for O(1) lookups"""
+    lookup = {
+        'team_code': {},
+        'team_id': {},
+        'player_key': {},
+        'element_id': {}
+    }
+    for season, teams in registry.get('teams', {}).items():
+        for team_id, code in teams.items():
+            lookup['team_code'][(season, team_id)] = code
+            lookup['team_id'][(season, code)] = team_id
+    for season, elements in registry.get('elements', {}).items():
+        for element_id, key in elements.items():
+            lookup['player_key'][(season, element_id)] = key
+            lookup['element_id'][(season, key)] = element_id
+    return lookup
+
+def team_code(lookup, season, team_id):
+    return lookup['team_code'].get((str(season), str(team_id)))
+
+def team_id(lookup, season, code):
+    return lookup['team_id'].get((str(season), str(code)))
+
+def player_key(lookup, season, element_id):
+    return lookup['player_key'].get((str(season), str(element_id)))
+
+def element_id(lookup, season, key):
+    return lookup['element_id'].get((str(season), key))
+
+def cross_season_mapping(registry, from_season, to_season):
+    """Map from_season element IDs to to_season element IDs via player keys"""
+    to_elements = {key: element for element, key in registry['elements'].get(str(to_season), {}).items()}
+    return {
+        element: to_elements[key]
+        for element, key in registry['elements'].get(str(from_season), {}).items()
+        if key in to_elements
+    }
+
+def players_from_api(elements):
+    """Registry rows from bootstrap-static elements (managers excluded)"""
+    return {
+        str(p['id']): {
+            'web_name': p['web_name'],
+            'first_name': p.get('first_name', ''),
+            'second_name': p.get('second_name', ''),
+            'team_id': str(p['team']),
+            'code': p.get('code')
+        }
+        for p in elements
+        if p.get('element_type') != 5
+    }
+
+def update_from_api(fpl_data, season=CURRENT_SEASON, file_path=None):
+    """Add this season's teams and players from bootstrap-static to the registry"""
+    registry = load_registry(file_path)
+    teams_changed = register_teams(registry, season, fpl_data.get('teams', []))
+    players_added, ambiguous = register_players(registry, season, players_from_api(fpl_data.get('elements', [])))
+    save_registry(registry, file_path)
+    return teams_changed, players_added, ambiguous
+
+def main():
+    """Seed the registry with team codes from data/teams_<season>.csv"""
+    print("🔄 Updating identity registry...")
+    registry = load_registry()
+    for season in ['2024', '2025']:
+        csv_path = data_path(f'teams_{season}.csv')
+        if not os.path.exists(csv_path):
+            print(f"⚠️  {csv_path} not found, skipping")
+            continue
+        changed = register_teams(registry, season, load_teams_csv(csv_path))
+        print(f"✅ {season}: {changed} team entries added or changed")
+    file_path = save_registry(registry)
+    print(f"📁 Saved to {file_path}")
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ import psycopg2
 import csv
 import os
 from datetime import datetime
+from create_team_stats_tables import refresh_rank_views
 
 # Database configuration
 DB_CONFIG = {
@@ -142,6 +143,7 @@ def main():
     
     # Import CSV data
     if import_team_stats_from_csv():
+        refresh_rank_views()
         print("\n✅ CSV import complete!")
     else:
         print("\n❌ CSV import failed!")
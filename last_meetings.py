@@ -0,0 +1,143 @@
+import json
+import os
+from datetime import datetime
+from data_store import data_path
+
+# Precomputed "last meeting" table.
+#
+# The planner's "Last" view needs one number per (player, opponent, venue):
+# the points from the most recent meeting. Instead of fetching whole fixture
+# lists per pair, the history pipeline publishes every pair in one file:
+#
+#   players:   [web_name, ...]
+#   opponents: [team code, ...]
+#   columns:   ['player', 'opponent', 'was_home', 'last_points', ...]
+#   rows:      [[player index, opponent index, 0/1, points, ...], ...]
+#
+# Names and codes are stored once and rows are plain arrays, which keeps the
+# file a fraction of the size of player-history.json. Incremental history
+# builds replace only the rows of the players they touched
+# (update_last_meetings); the result is the same table a full build makes.
+LAST_MEETINGS_FILE = 'last-meetings.json'
+
+# Average points over the last N meetings at the same venue
+AVERAGE_WINDOWS = [3, 5]
+
+COLUMNS = ['player', 'opponent', 'was_home', 'last_points', 'last_gameweek', 'meetings'] + \
+    [f'avg_{window}' for window in AVERAGE_WINDOWS]
+
+def meeting_rows(fixtures):
+    """Yield (was_home, last_points, last_gameweek, meetings, *averages) per venue
+
+    Fixtures are in chronological order, as stored in player-history.json.
+    """
+    for was_home in (True, False):
+        venue_fixtures = [f for f in fixtures if f['was_home'] == was_home]
+        if not venue_fixtures:
+            continue
+        points = [f['total_points'] or 0 for f in venue_fixtures]
+        averages = [round(sum(points[-window:]) / len(points[-window:]), 2) for window in AVERAGE_WINDOWS]
+        yield (1 if was_home else 0, points[-1], venue_fixtures[-1]['gameweek'], len(points), *averages)
+
+def player_meetings(opponents):
+    """[(team code, row), ...] for one player's {team_code: {fixtures, ...}}"""
+    return [
+        (team_code, row)
+        for team_code, entry in opponents.items()
+        for row in meeting_rows(entry.get('fixtures', []))
+    ]
+
+def encode_last_meetings(meetings):
+    """Array-encode {player_name: [(team code, row), ...]}; players in name order"""
+    players = []
+    opponents = []
+    opponent_index = {}
+    rows = []
+
+    for player_name in sorted(meetings):
+        player_rows = meetings[player_name]
+        if not player_rows:
+            continue
+        index = len(players)
+        players.append(player_name)
+        for team_code, row in player_rows:
+            if team_code not in opponent_index:
+                opponent_index[team_code] = len(opponents)
+                opponents.append(team_code)
+            rows.append([index, opponent_index[team_code], *row])
+
+    return {
+        'players': players,
+        'opponents': opponents,
+        'columns': COLUMNS,
+        'windows': AVERAGE_WINDOWS,
+        'rows': rows
+    }
+
+def decode_last_meetings(table):
+    """{player_name: [(team code, row), ...]} from an encoded table"""
+    meetings = {}
+    for player, opponent, *row in table['rows']:
+        meetings.setdefault(table['players'][player], []).append((table['opponents'][opponent], tuple(row)))
+    return meetings
+
+def build_last_meetings(history_data, current_players=None):
+    """Build the array-encoded table from player-history data
+
+    current_players optionally limits the table to these web names.
+    """
+    return encode_last_meetings({
+        player_name: player_meetings(opponents)
+        for player_name, opponents in history_data.items()
+        if current_players is None or player_name in current_players
+    })
+
+def _write_table(file_path, table, last_updated):
+    output = {'last_updated': last_updated or datetime.now().isoformat(), **table}
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(output, f, separators=(',', ':'), ensure_ascii=False)
+    os.replace(tmp_path, file_path)
+    return output
+
+def export_last_meetings(history_data, last_updated=None, current_players=None, file_path=None):
+    """Write data/last-meetings.json"""
+    file_path = file_path or data_path(LAST_MEETINGS_FILE)
+    table = build_last_meetings(history_data, current_players)
+    output = _write_table(file_path, table, last_updated)
+    print(f"✅ Exported {len(table['rows'])} last meetings for {len(table['players'])} players to {file_path}")
+    return output
+
+def update_last_meetings(players, last_updated=None, current_players=None, file_path=None):
+    """Replace these players' rows in data/last-meetings.json (players: {web_name: opponents})"""
+    file_path = file_path or data_path(LAST_MEETINGS_FILE)
+    with open(file_path, 'r', encoding='utf-8') as f:
+        meetings = decode_last_meetings(json.load(f))
+    for player_name, opponents in players.items():
+        if current_players is None or player_name in current_players:
+            meetings[player_name] = player_meetings(opponents)
+        else:
+            meetings.pop(player_name, None)
+
+    table = encode_last_meetings(meetings)
+    output = _write_table(file_path, table, last_updated)
+    print(f"✅ Updated last meetings for {len(players)} players in {file_path} ({len(table['rows'])} in total)")
+    return output
+
+def load_current_player_names(file_path=None):
+    """Web names of the current players in data/players.json, or None if missing"""
+    file_path = file_path or data_path('players.json')
+    if not os.path.exists(file_path):
+        return None
+    with open(file_path, 'r') as f:
+        return {player['web_name'] for player in json.load(f)['data']}
+
+def main():
+    """Rebuild data/last-meetings.json from data/player-history.json"""
+    print("🚀 Building last meetings table...")
+    with open(data_path('player-history.json'), 'r') as f:
+        history = json.load(f)
+    export_last_meetings(history['data'], history.get('last_updated'), load_current_player_names())
+
+if __name__ == "__main__":
+    main()
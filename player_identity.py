@@ -0,0 +1,154 @@
+import csv
+import unicodedata
+from collections import defaultdict
+
+# Player identity resolution across seasons.
+#
+# Player IDs change every season (see data_audit_report.md), so historical
+# players are matched to current players by name. Instead of comparing every
+# historical player with every current player, the current players are
+# indexed once by normalized name variants, and each lookup is a handful of
+# dict hits. Candidates from the same club (by stable team code) win over
+# matches elsewhere in the league.
+
+# Letters that NFKD does not decompose into base letter + accent
+_EXTRA_FOLDS = str.maketrans({
+    'ø': 'o', 'Ø': 'o', 'æ': 'ae', 'Æ': 'ae', 'œ': 'oe', 'Œ': 'oe',
+    'ß': 'ss', 'đ': 'd', 'Đ': 'd', 'ł': 'l', 'Ł': 'l', 'ı': 'i',
+})
+
+# Variant tiers, strongest first. Surname-only matches are too loose to accept
+# without a matching club.
+MATCH_TIERS = ['web_name', 'full_name', 'initial_surname', 'surname']
+TEAM_ONLY_TIERS = {'surname'}
+
+def normalize_name(name):
+    """Lowercase, accent-fold and collapse punctuation: 'M.Ødegaard' -> 'm odegaard'"""
+    if not name:
+        return ''
+    folded = unicodedata.normalize('NFKD', name.translate(_EXTRA_FOLDS))
+    folded = ''.join(c for c in folded if not unicodedata.combining(c)).lower()
+    cleaned = ''.join(c if c.isalnum() else ' ' for c in folded)
+    return ' '.join(cleaned.split())
+
+def name_variants(player):
+    """Return {tier: set of normalized names} for a player row
+
+    Uses web_name, and first_name/second_name when the source has them.
+    """
+    web_name = normalize_name(player.get('web_name'))
+    first_name = normalize_name(player.get('first_name'))
+    second_name = normalize_name(player.get('second_name'))
+
+    variants = {tier: set() for tier in MATCH_TIERS}
+    if web_name:
+        variants['web_name'].add(web_name)
+    if first_name and second_name:
+        variants['full_name'].add(f"{first_name} {second_name}")
+    if second_name:
+        surname = second_name.split()[-1]
+        variants['surname'].add(surname)
+        if first_name:
+            variants['initial_surname'].add(f"{first_name[0]} {surname}")
+            variants['initial_surname'].add(f"{first_name[0]} {second_name}")
+    if web_name:
+        # 'M.Salah' style web names: treat as initial + surname as well
+        tokens = web_name.split()
+        if len(tokens) == 2 and len(tokens[0]) == 1:
+            variants['initial_surname'].add(web_name)
+        variants['surname'].add(tokens[-1])
+    return variants
+
+def build_player_index(players, team_codes=None):
+    """Index current players by name variant, globally and per team code
+
+    players maps player id -> row with web_name (and optionally first_name,
+    second_name, team_id). team_codes maps that season's team_id -> team code.
+    """
+    team_codes = team_codes or {}
+    index = {
+        'global': {tier: defaultdict(set) for tier in MATCH_TIERS},
+        'by_team': {tier: defaultdict(set) for tier in MATCH_TIERS},
+    }
+    for player_id, player in players.items():
+        team_code = team_codes.get(str(player.get('team_id')))
+        for tier, names in name_variants(player).items():
+            for name in names:
+                index['global'][tier][name].add(player_id)
+                if team_code:
+                    index['by_team'][tier][(team_code, name)].add(player_id)
+    return index
+
+def resolve_player(index, player, team_code=None):
+    """Resolve one player against an index built by build_player_index
+
+    Returns (player_id, candidates): player_id is None when nothing matched or
+    the match was ambiguous, in which case candidates lists the tied IDs.
+    """
+    ambiguous = set()
+    for tier, names in name_variants(player).items():
+        team_hits = set()
+        global_hits = set()
+        for name in names:
+            if team_code:
+                team_hits |= index['by_team'][tier].get((team_code, name), set())
+            if tier not in TEAM_ONLY_TIERS:
+                global_hits |= index['global'][tier].get(name, set())
+
+        if len(team_hits) == 1:
+            return next(iter(team_hits)), []
+        if len(global_hits) == 1:
+            return next(iter(global_hits)), []
+        ambiguous |= team_hits if len(team_hits) > 1 else global_hits
+
+    return None, sorted(ambiguous, key=str)
+
+def build_name_mapping(historical_players, current_players, historical_team_codes=None, current_team_codes=None):
+    """Map historical player IDs to current player IDs
+
+    Returns (name_mapping, ambiguous) where ambiguous maps historical IDs that
+    matched several current players to the candidate IDs.
+    """
+    historical_team_codes = historical_team_codes or {}
+    index = build_player_index(current_players, current_team_codes)
+
+    name_mapping = {}
+    ambiguous = {}
+    for hist_id, hist_player in historical_players.items():
+        team_code = historical_team_codes.get(str(hist_player.get('team_id')))
+        current_id, candidates = resolve_player(index, hist_player, team_code)
+        if current_id is not None:
+            name_mapping[hist_id] = current_id
+        elif candidates:
+            ambiguous[hist_id] = candidates
+    return name_mapping, ambiguous
+
+def load_players_csv(path):
+    """Load an FPL players CSV as {id: row}"""
+    players = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            players[row['id']] = {
+                'web_name': row['web_name'],
+                'first_name': row.get('first_name', ''),
+                'second_name': row.get('second_name', ''),
+                'team_id': row['team_id'],
+                'element_type': row.get('element_type', ''),
+                'code': row.get('code', '')
+            }
+    return players
+
+def load_team_codes(path):
+    """Load a season's teams CSV as {team_id: team code}"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return {row['id']: row['code'] for row in csv.DictReader(f)}
+
+def report_ambiguous(ambiguous, historical_players, current_players, limit=5):
+    """Print a short summary of ambiguous matches"""
+    if not ambiguous:
+        return
+    print(f"⚠️  {len(ambiguous)} players matched more than one current player:")
+    for hist_id, candidates in list(ambiguous.items())[:limit]:
+        names = ', '.join(f"{current_players[c]['web_name']} (ID {c})" for c in candidates)
+        print(f"  {historical_players[hist_id]['web_name']} (ID {hist_id}) → {names}")
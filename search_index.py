@@ -0,0 +1,179 @@
+from data_store import get_derived, load_data_file
+from identity_registry import CURRENT_SEASON, REGISTRY_FILE
+from player_identity import normalize_name
+
+# Player and team search index.
+#
+# Names are normalized with the same accent folding as the identity matcher
+# ('Ødegaard' and 'odegaard' are the same token), split into tokens, and each
+# distinct token is indexed with the documents it occurs in. A query token
+# matches every indexed token that contains it, like the planner's substring
+# filter. To find those without scanning the vocabulary, every token is also
+# indexed by its n-grams up to GRAM_SIZE characters ({gram: set of tokens}):
+# a query token of up to GRAM_SIZE characters is a gram itself, a longer one
+# intersects the token sets of its grams and checks the few candidates left.
+# Their documents are then intersected across query tokens.
+#
+# Player tokens come from web_name, first/second name (from the identity
+# registry, players.json doesn't carry them) and the player's team name and
+# short name. Each field has a weight; whole-token matches score extra,
+# matches at the start of a token a little less, and ties go to the player
+# with more points.
+FIELD_WEIGHTS = {
+    'web_name': 4,
+    'second_name': 3,
+    'first_name': 2,
+    'team_name': 1,
+    'team_short_name': 1,
+}
+EXACT_BONUS = 2
+PREFIX_BONUS = 1
+GRAM_SIZE = 3
+
+def tokens(text):
+    return normalize_name(text).split()
+
+def _index_document(index_tokens, doc_index, fields):
+    """Add a document's {field: text} to the token index ({token: {doc: weight}})"""
+    for field, text in fields.items():
+        weight = FIELD_WEIGHTS[field]
+        for token in tokens(text):
+            entry = index_tokens.setdefault(token, {})
+            entry[doc_index] = max(entry.get(doc_index, 0), weight)
+
+def token_grams(token, max_size=GRAM_SIZE):
+    """Every distinct substring of token with 1..max_size characters"""
+    return {
+        token[start:start + size]
+        for size in range(1, min(max_size, len(token)) + 1)
+        for start in range(len(token) - size + 1)
+    }
+
+def _index_grams(index):
+    """Index each distinct token under its n-grams ({gram: set of tokens})"""
+    grams = {}
+    for token in index['tokens']:
+        for gram in token_grams(token):
+            grams.setdefault(gram, set()).add(token)
+    index['grams'] = grams
+
+def _new_index(ids, order):
+    return {'ids': ids, 'order': order, 'tokens': {}, 'grams': {}}
+
+def _matching_tokens(index, query_token):
+    """Indexed tokens containing query_token, found through the n-gram index"""
+    grams = index['grams']
+    if len(query_token) <= GRAM_SIZE:
+        return grams.get(query_token, ())
+
+    # Smallest gram set first; every candidate still has to contain the whole query
+    gram_sets = sorted(
+        (grams.get(query_token[i:i + GRAM_SIZE], set()) for i in range(len(query_token) - GRAM_SIZE + 1)),
+        key=len
+    )
+    candidates = set(gram_sets[0])
+    for gram_set in gram_sets[1:]:
+        if not candidates:
+            break
+        candidates &= gram_set
+    return [token for token in candidates if query_token in token]
+
+def _postings(index, query_token):
+    """{doc: score} for documents with a token containing query_token"""
+    postings = {}
+    for token in _matching_tokens(index, query_token):
+        entry = index['tokens'][token]
+        bonus = EXACT_BONUS if token == query_token else PREFIX_BONUS if token.startswith(query_token) else 0
+        for doc, weight in entry.items():
+            if weight + bonus > postings.get(doc, 0):
+                postings[doc] = weight + bonus
+    return postings
+
+def registry_names(registry):
+    """Current-season element_id -> (first_name, second_name) from the identity registry"""
+    elements = registry.get('elements', {}).get(CURRENT_SEASON, {})
+    players = registry.get('players', {})
+    return {
+        int(element_id): (players[key].get('first_name', ''), players[key].get('second_name', ''))
+        for element_id, key in elements.items()
+        if key in players
+    }
+
+def build_search_index(players, teams, names=None):
+    """Build player and team indexes from players.json and teams.json rows
+
+    names optionally maps player id -> (first_name, second_name).
+    """
+    names = names or {}
+    teams_by_id = {team['id']: team for team in teams}
+
+    player_index = _new_index(
+        [player['id'] for player in players],
+        # Tie-break order: more points first, then name
+        {player['id']: (-(player.get('total_points') or 0), player.get('web_name', '')) for player in players}
+    )
+    for i, player in enumerate(players):
+        team = teams_by_id.get(player.get('team_id'), {})
+        first_name, second_name = names.get(player['id'], ('', ''))
+        _index_document(player_index['tokens'], i, {
+            'web_name': player.get('web_name'),
+            'first_name': first_name,
+            'second_name': second_name,
+            'team_name': team.get('name'),
+            'team_short_name': team.get('short_name'),
+        })
+    _index_grams(player_index)
+
+    team_index = _new_index(
+        [team['id'] for team in teams],
+        {team['id']: (0, team.get('name', '')) for team in teams}
+    )
+    for i, team in enumerate(teams):
+        _index_document(team_index['tokens'], i, {
+            'team_name': team.get('name'),
+            'team_short_name': team.get('short_name'),
+        })
+    _index_grams(team_index)
+
+    return {'players': player_index, 'teams': team_index}
+
+def search(index, query, limit=None):
+    """Ranked IDs of documents where every query token is part of one of their tokens"""
+    query_tokens = tokens(query)
+    if not query_tokens:
+        return []
+
+    # Most selective token first so the intersection shrinks quickly
+    postings = [_postings(index, token) for token in query_tokens]
+    if not all(postings):
+        return []
+    order = sorted(range(len(query_tokens)), key=lambda t: len(postings[t]))
+
+    scores = dict(postings[order[0]])
+    for t in order[1:]:
+        posting = postings[t]
+        scores = {doc: score + posting[doc] for doc, score in scores.items() if doc in posting}
+        if not scores:
+            return []
+
+    ids = index['ids']
+    ranked = sorted(scores, key=lambda doc: (-scores[doc], index['order'][ids[doc]]))
+    if limit:
+        ranked = ranked[:limit]
+    return [ids[doc] for doc in ranked]
+
+def _build_from_files(players_data):
+    teams = load_data_file('teams.json')['data']
+    try:
+        names = registry_names(load_data_file(REGISTRY_FILE))
+    except FileNotFoundError:
+        names = {}
+    return build_search_index(players_data['data'], teams, names)
+
+def get_search_index():
+    """Search index for the current data, rebuilt when players.json changes
+
+    teams.json and the registry are read at build time; both change far less
+    often than players.json, which is re-exported on every sync.
+    """
+    return get_derived('players.json', 'search_index', _build_from_files)
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+from data_store import data_path, get_derived, load_data_file, load_data_file_lru, snapshot_version
+
+# Snapshot history for delta sync.
+#
+# After each export the pipeline records the snapshot version together with a
+# short hash of every player, team and fixture:
+#
+#   data/snapshots/index.json       recorded versions, oldest first
+#   data/snapshots/<version>.json   {dataset: {record id: record hash}}
+#
+# /api/changes?since=<version> compares those hashes with the current files
+# and returns only inserted, updated and deleted records, so a client holding
+# an older snapshot downloads what changed rather than whole datasets. Only
+# the last HISTORY_SIZE versions are kept; older clients do a full reload.
+# The directory sits below data/, so it is not part of the snapshot version.
+SNAPSHOTS_DIR = 'snapshots'
+INDEX_FILE = f'{SNAPSHOTS_DIR}/index.json'
+HISTORY_SIZE = 14
+
+# Dataset name -> (data file, record key)
+DATASETS = {
+    'players': ('players.json', 'id'),
+    'teams': ('teams.json', 'id'),
+    'fixtures': ('fixtures.json', 'id'),
+}
+
+def snapshot_filename(version):
+    return f'{SNAPSHOTS_DIR}/{version}.json'
+
+def record_hash(record):
+    """Short content hash of one record (key order doesn't matter)"""
+    canonical = json.dumps(record, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+def record_hashes(rows, key):
+    """{record id (as str): record hash}"""
+    return {str(row[key]): record_hash(row) for row in rows}
+
+def current_hashes(dataset):
+    """Record hashes of the current data file, cached until the file changes"""
+    filename, key = DATASETS[dataset]
+    return get_derived(filename, 'record_hashes', lambda data: record_hashes(data['data'], key))
+
+def _write_json(file_path, payload):
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, separators=(',', ':'), ensure_ascii=False)
+    os.replace(tmp_path, file_path)
+
+def _read_index():
+    try:
+        with open(data_path(INDEX_FILE), 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'versions': []}
+
+def record_snapshot(history_size=HISTORY_SIZE):
+    """Record the current snapshot's record hashes; returns the version"""
+    version = snapshot_version()
+    index = _read_index()
+    if any(entry['version'] == version for entry in index['versions']):
+        return version
+
+    os.makedirs(data_path(SNAPSHOTS_DIR), exist_ok=True)
+    hashes = {}
+    for dataset, (filename, key) in DATASETS.items():
+        with open(data_path(filename), 'r') as f:
+            hashes[dataset] = record_hashes(json.load(f)['data'], key)
+    _write_json(data_path(snapshot_filename(version)), {'version': version, 'hashes': hashes})
+
+    index['versions'].append({'version': version, 'recorded': datetime.now().isoformat()})
+    expired, index['versions'] = index['versions'][:-history_size], index['versions'][-history_size:]
+    # Index last, so readers never see a version without its hashes
+    _write_json(data_path(INDEX_FILE), index)
+    for entry in expired:
+        try:
+            os.remove(data_path(snapshot_filename(entry['version'])))
+        except FileNotFoundError:
+            pass
+    return version
+
+def load_snapshot_hashes(version):
+    """{dataset: {id: hash}} for a recorded version, or None if it isn't in the history"""
+    try:
+        index = load_data_file(INDEX_FILE)
+    except FileNotFoundError:
+        return None
+    if not any(entry['version'] == version for entry in index['versions']):
+        return None
+    try:
+        return load_data_file_lru(snapshot_filename(version))['hashes']
+    except FileNotFoundError:
+        return None
+
+def diff_dataset(rows, key, old_hashes, new_hashes):
+    """{'inserted': [rows], 'updated': [rows], 'deleted': [ids]} between two hash maps"""
+    inserted, updated = [], []
+    for row in rows:
+        old = old_hashes.get(str(row[key]))
+        if old is None:
+            inserted.append(row)
+        elif old != new_hashes[str(row[key])]:
+            updated.append(row)
+    deleted = [int(record_id) for record_id in old_hashes if record_id not in new_hashes]
+    return {'inserted': inserted, 'updated': updated, 'deleted': deleted}
+
+def changes_since(since):
+    """Changes from snapshot version since to the current data, or None if since is unknown"""
+    version = snapshot_version()
+    if since == version:
+        unchanged = {dataset: {'inserted': [], 'updated': [], 'deleted': []} for dataset in DATASETS}
+        return {'since': since, 'version': version, 'changes': unchanged}
+
+    old = load_snapshot_hashes(since)
+    if old is None:
+        return None
+    changes = {}
+    for dataset, (filename, key) in DATASETS.items():
+        changes[dataset] = diff_dataset(
+            load_data_file(filename)['data'], key, old.get(dataset, {}), current_hashes(dataset)
+        )
+    return {'since': since, 'version': version, 'changes': changes}
+
+def main():
+    """Record the current data snapshot in data/snapshots/"""
+    print("🗂️  Recording data snapshot...")
+    try:
+        version = record_snapshot()
+    except FileNotFoundError as e:
+        print(f"❌ Missing data file: {e.filename}")
+        return False
+    versions = len(_read_index()['versions'])
+    print(f"✅ Snapshot {version} recorded ({versions} versions kept)")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
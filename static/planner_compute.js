@@ -0,0 +1,202 @@
+// Planner compute engine: sorting, per 90 normalization, deltas, rankings,
+// top-N and stat leaders for the players and teams tables.
+//
+// Runs as a Web Worker (the page posts the player columns once per data load
+// and then one small request per render), and is also loaded as a plain
+// script so the page can run the same functions inline when workers are
+// unavailable. Player stats are held as typed-array columns indexed by row.
+
+const NUMERIC_FIELDS = [
+    'id', 'element_type', 'team_id', 'now_cost', 'minutes', 'total_points',
+    'goals_scored', 'assists', 'expected_goals', 'expected_assists',
+    'clean_sheets', 'goals_conceded', 'bonus', 'saves'
+];
+
+// Fields that switch to per 90 values when per 90 is enabled
+const PER90_FIELDS = ['total_points', 'goals_scored', 'assists', 'expected_goals', 'expected_assists', 'clean_sheets', 'goals_conceded', 'bonus', 'saves'];
+
+// Stats columns shown in stats mode (rankings and leaders are computed for all of them)
+const STAT_COLUMNS = ['goals_scored', 'expected_goals', 'xG_delta', 'assists', 'xA_delta', 'goals_assists', 'clean_sheets', 'goals_conceded', 'saves', 'bonus'];
+const TEAM_STAT_COLUMNS = ['goals_scored', 'goals_conceded', 'clean_sheets', 'saves'];
+const LOWER_IS_BETTER = ['goals_conceded'];
+
+const PER90_MIN_MINUTES = 900;
+const TOP_PLAYERS = 10;
+const TOP_TEAMS = 6;
+
+function buildPlayerColumns(players) {
+    const columns = { length: players.length, web_name: players.map(p => p.web_name || '') };
+    NUMERIC_FIELDS.forEach(field => {
+        const values = new Float64Array(players.length);
+        players.forEach((player, i) => {
+            values[i] = parseFloat(player[field] || 0) || 0;
+        });
+        columns[field] = values;
+    });
+    return columns;
+}
+
+function round(value, digits) {
+    return parseFloat(value.toFixed(digits));
+}
+
+function per90(columns, field, i) {
+    const minutes = columns.minutes[i];
+    return minutes > 0 ? round(columns[field][i] * 90 / minutes, 2) : 0;
+}
+
+function xgDelta(columns, i) {
+    return round(columns.goals_scored[i] - columns.expected_goals[i], 1);
+}
+
+function xaDelta(columns, i) {
+    return round(columns.assists[i] - columns.expected_assists[i], 1);
+}
+
+// Displayed value of a stats column, as a number (deltas keep their sign)
+function statValue(columns, stat, i) {
+    if (stat === 'expected_goals' || stat === 'expected_assists') return round(columns[stat][i], 1);
+    if (stat === 'xG_delta') return xgDelta(columns, i);
+    if (stat === 'xA_delta') return xaDelta(columns, i);
+    if (stat === 'goals_assists') return columns.goals_scored[i] + columns.assists[i];
+    return columns[stat][i];
+}
+
+function sortKey(columns, field, usePer90, i) {
+    if (usePer90 && PER90_FIELDS.includes(field)) return per90(columns, field, i);
+    if (field === 'goals_assists') return columns.goals_scored[i] + columns.assists[i];
+    if (field === 'xG_delta') return xgDelta(columns, i);
+    if (field === 'xA_delta') return columns.assists[i] - columns.expected_assists[i];
+    return field in columns ? columns[field][i] : undefined;
+}
+
+// Rank rows by value (best first); equal values share a rank
+function competitionRanks(rows, values, lowerIsBetter) {
+    const order = rows.slice().sort((a, b) => lowerIsBetter ? values[a] - values[b] : values[b] - values[a]);
+    const ranks = new Map();
+    let rank = 1;
+    order.forEach((row, index) => {
+        if (index > 0 && values[row] !== values[order[index - 1]]) rank = index + 1;
+        ranks.set(row, rank);
+    });
+    return { order, ranks };
+}
+
+// Rows holding the best value of a stat (ties included)
+function leaderRows(rows, valueOf, lowerIsBetter) {
+    let leaders = [];
+    let best = lowerIsBetter ? Infinity : -Infinity;
+    rows.forEach(row => {
+        const value = valueOf(row);
+        if (lowerIsBetter ? value < best : value > best) {
+            best = value;
+            leaders = [row];
+        } else if (value === best) {
+            leaders.push(row);
+        }
+    });
+    return leaders;
+}
+
+function computePlayerView(columns, request) {
+    const ids = columns.id;
+    const rowOf = new Map();
+    for (let i = 0; i < columns.length; i++) rowOf.set(ids[i], i);
+    const rows = request.ids ? request.ids.map(id => rowOf.get(id)).filter(i => i !== undefined) : [...Array(columns.length).keys()];
+    const toIds = list => list.map(i => ids[i]);
+    const lowerIsBetter = stat => LOWER_IS_BETTER.includes(stat);
+
+    // Rank mode: total points rank over the searched players
+    const playerRanking = {};
+    if (request.rankMode) {
+        const { ranks } = competitionRanks(rows, columns.total_points, false);
+        ranks.forEach((rank, i) => { playerRanking[ids[i]] = rank; });
+    }
+
+    // Sort (stable, so equal keys keep data order)
+    const keys = new Map(rows.map(i => [i, sortKey(columns, request.sortField, request.per90, i)]));
+    const ascending = request.direction === 'asc';
+    const sorted = rows.slice().sort((a, b) => {
+        const aVal = keys.get(a);
+        const bVal = keys.get(b);
+        if (aVal < bVal) return ascending ? -1 : 1;
+        if (aVal > bVal) return ascending ? 1 : -1;
+        return 0;
+    });
+
+    // Per 90 only lists players with enough minutes
+    const visible = request.per90 ? sorted.filter(i => columns.minutes[i] >= PER90_MIN_MINUTES) : sorted;
+
+    // Top 10 by total points (per 90 when enabled), players without points excluded
+    const points = new Float64Array(columns.length);
+    visible.forEach(i => { points[i] = request.per90 ? per90(columns, 'total_points', i) : columns.total_points[i]; });
+    const scoring = visible.filter(i => points[i] > 0).sort((a, b) => points[b] - points[a]);
+    scoring.forEach((i, index) => { playerRanking[ids[i]] = index + 1; });
+
+    // Stats column rankings over the searched players (deltas ranked by size)
+    const allRankings = {};
+    const top10Rankings = {};
+    const leaders = {};
+    const selectedRows = (request.selectedIds || []).map(id => rowOf.get(id)).filter(i => i !== undefined);
+    STAT_COLUMNS.concat(['total_points']).forEach(stat => {
+        const values = new Float64Array(columns.length);
+        rows.forEach(i => {
+            const value = statValue(columns, stat, i);
+            values[i] = stat === 'xG_delta' || stat === 'xA_delta' ? Math.abs(value) : value;
+        });
+        const { order, ranks } = competitionRanks(rows, values, lowerIsBetter(stat));
+        allRankings[stat] = {};
+        ranks.forEach((rank, i) => { allRankings[stat][ids[i]] = rank; });
+        top10Rankings[stat] = {};
+        order.slice(0, TOP_PLAYERS).forEach(i => { top10Rankings[stat][ids[i]] = ranks.get(i); });
+
+        leaders[stat] = toIds(leaderRows(selectedRows, i => statValue(columns, stat, i), lowerIsBetter(stat)));
+    });
+
+    return {
+        sortedIds: toIds(sorted),
+        visibleIds: toIds(visible),
+        playerRanking,
+        top10Ids: toIds(scoring.slice(0, TOP_PLAYERS)),
+        allRankings,
+        top10Rankings,
+        leaders
+    };
+}
+
+// request.teams: [{id, stats}] where stats is the team's row for the current location (or null)
+function computeTeamView(request) {
+    const topTeams = {};
+    const leaders = {};
+    const selected = request.teams.filter(team => (request.selectedIds || []).includes(team.id));
+    TEAM_STAT_COLUMNS.forEach(stat => {
+        const lowerIsBetter = LOWER_IS_BETTER.includes(stat);
+        topTeams[stat] = request.teams
+            .filter(team => team.stats && team.stats[stat] !== undefined && team.stats[stat] !== null && team.stats[stat] !== 'N/A' && team.stats[stat] > 0)
+            .sort((a, b) => lowerIsBetter ? a.stats[stat] - b.stats[stat] : b.stats[stat] - a.stats[stat])
+            .slice(0, TOP_TEAMS)
+            .map(team => team.id);
+        leaders[stat] = leaderRows(selected, team => parseFloat(team.stats ? (team.stats[stat] || 0) : 0) || 0, lowerIsBetter)
+            .map(team => team.id);
+    });
+    return { topTeams, leaders };
+}
+
+if (typeof WorkerGlobalScope !== 'undefined' && self instanceof WorkerGlobalScope) {
+    let playerColumns = null;
+    self.onmessage = (event) => {
+        const message = event.data;
+        if (message.type === 'load') {
+            playerColumns = message.columns;
+            return;
+        }
+        try {
+            const result = message.type === 'players'
+                ? computePlayerView(playerColumns, message.request)
+                : computeTeamView(message.request);
+            self.postMessage({ requestId: message.requestId, result });
+        } catch (error) {
+            self.postMessage({ requestId: message.requestId, error: String(error) });
+        }
+    };
+}
@@ -3,6 +3,8 @@ import psycopg2
 from psycopg2.extras import RealDictCursor
 import json
 from datetime import datetime
+from create_team_stats_tables import refresh_rank_views
+from identity_registry import update_from_api
 
 # Database configuration
 DB_CONFIG = {
@@ -27,18 +29,26 @@ def fetch_fpl_api_data():
         print(f"Error fetching FPL API data: {e}")
         return None
 
+def fetch_fpl_fixtures():
+    """Fetch the season's fixtures from the official API"""
+    try:
+        url = "https://fantasy.premierleague.com/api/fixtures/"
+        response = requests.get(url)
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        print(f"Error fetching FPL fixtures: {e}")
+        return None
+
 def create_players_2025_table():
     """Create the new players_2025 table with essential fields"""
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        # Drop table if it exists
-        cursor.execute("DROP TABLE IF EXISTS players_2025")
-        
-        # Create new table with essential fields for draft planning
+        # Keep the table (rank views depend on it); rows are replaced on sync
         cursor.execute("""
-            CREATE TABLE players_2025 (
+            CREATE TABLE IF NOT EXISTS players_2025 (
                 id INTEGER PRIMARY KEY,
                 web_name VARCHAR(100) NOT NULL,
                 first_name VARCHAR(100),
@@ -137,6 +147,9 @@ def sync_players_2025():
         # Get players (exclude managers - element_type 5)
         players = [p for p in fpl_data.get('elements', []) if p['element_type'] != 5]
         
+        # Replace rows in the same transaction so readers never see an empty table
+        cursor.execute("DELETE FROM players_2025")
+        
         # Insert player data with essential fields
         for player in players:
             cursor.execute("""
@@ -176,16 +189,14 @@ def sync_players_2025():
 def sync_fixtures_2025():
     """Sync fixtures data to fixtures_2025 table"""
     try:
-        fpl_data = fetch_fpl_api_data()
-        if not fpl_data:
+        # bootstrap-static only has gameweeks ('events'), the fixtures come from their own endpoint
+        fixtures = fetch_fpl_fixtures()
+        if fixtures is None:
             return False
             
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        # Get fixtures
-        fixtures = fpl_data.get('events', [])
-        
         # Insert fixture data
         for fixture in fixtures:
             cursor.execute("""
@@ -202,10 +213,10 @@ def sync_fixtures_2025():
                     kickoff_time = EXCLUDED.kickoff_time,
                     updated_at = CURRENT_TIMESTAMP
             """, (
-                fixture['id'], fixture['id'], 
+                fixture['id'], fixture.get('event'),
                 fixture.get('team_h'), fixture.get('team_a'),
                 fixture.get('team_h_difficulty', 3), fixture.get('team_a_difficulty', 3),
-                fixture.get('deadline_time')
+                fixture.get('kickoff_time')
             ))
         
         conn.commit()
@@ -218,6 +229,23 @@ def sync_fixtures_2025():
         print(f"❌ Error syncing fixtures: {e}")
         return False
 
+def sync_identity_registry():
+    """Add this season's team codes and player keys to data/identity-registry.json"""
+    try:
+        fpl_data = fetch_fpl_api_data()
+        if not fpl_data:
+            return False
+        
+        teams_changed, players_added, ambiguous = update_from_api(fpl_data)
+        print(f"✅ Identity registry: {teams_changed} team entries changed, {players_added} players added")
+        if ambiguous:
+            print(f"⚠️  {len(ambiguous)} players matched more than one registered player")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error updating identity registry: {e}")
+        return False
+
 def update_server_to_use_2025_tables():
     """Update the server.py to use the new 2025 tables"""
     try:
@@ -263,8 +291,16 @@ def main():
         print("❌ Failed to sync fixtures. Aborting.")
         return
     
-    # Step 5: Update server
-    print("\n🔧 Step 5: Updating server configuration...")
+    # Step 5: Update cross-season identity registry
+    print("\n🪪 Step 5: Updating identity registry...")
+    sync_identity_registry()
+    
+    # Step 6: Refresh materialized rank views
+    print("\n📈 Step 6: Refreshing rank views...")
+    refresh_rank_views()
+    
+    # Step 7: Update server
+    print("\n🔧 Step 7: Updating server configuration...")
     update_server_to_use_2025_tables()
     
     print("\n✅ FPL Data Sync Complete!")
@@ -273,6 +309,8 @@ def main():
     print("• Created players_2025 table with current FPL data")
     print("• Updated teams_2025 table with current team data")
     print("• Updated fixtures_2025 table with current fixture data")
+    print("• Added new season IDs to the identity registry")
+    print("• Refreshed team rank and goalkeeper saves views")
     print("• Updated server.py to use new tables")
     print("\n🚀 Your draft planner will now use the latest FPL data!")
     print("\n💡 Next steps:")
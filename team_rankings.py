@@ -0,0 +1,147 @@
+import math
+
+# Weights for the attack and defence scores:
+#   attack  = (goals * 0.7 + xG * 0.3) / games_played              (higher is better)
+#   defence = (conceded * 0.6 + xGC * 0.2) / games_played - cs * 0.2 (lower is better)
+DEFAULT_WEIGHTS = {
+    'goals': 0.7,
+    'expected_goals': 0.3,
+    'goals_conceded': 0.6,
+    'expected_goals_conceded': 0.2,
+    'clean_sheets': 0.2,
+}
+
+LOCATIONS = ['home', 'away', 'overall']
+
+STAT_COLUMNS = [
+    'team_id', 'games_played', 'goals_scored', 'expected_goals',
+    'goals_conceded', 'expected_goals_conceded', 'clean_sheets'
+]
+
+def resolve_weights(overrides=None):
+    """Merge user-supplied weight overrides over the defaults (finite, non-negative numbers)"""
+    weights = dict(DEFAULT_WEIGHTS)
+    if overrides:
+        for key, value in overrides.items():
+            if key not in DEFAULT_WEIGHTS:
+                raise ValueError(f"Unknown ranking weight: {key}")
+            weight = float(value)
+            # nan/inf would make every score non-finite (and NaN isn't valid JSON)
+            if not math.isfinite(weight) or weight < 0:
+                raise ValueError(f"Ranking weight {key} must be a finite, non-negative number")
+            weights[key] = weight
+    return weights
+
+def to_columns(stats_rows):
+    """Transpose team stats rows into per-stat columns (computed once per snapshot)"""
+    columns = {
+        'team_id': [row.get('team_id') for row in stats_rows],
+        'team_name': [row.get('team_name') for row in stats_rows],
+    }
+    for name in STAT_COLUMNS[1:]:
+        columns[name] = [float(row.get(name) or 0) for row in stats_rows]
+    return columns
+
+def attack_scores(columns, weights=DEFAULT_WEIGHTS):
+    """Attack score per team, None for teams that have not played"""
+    wg, wx = weights['goals'], weights['expected_goals']
+    return [
+        (g * wg + x * wx) / gp if gp else None
+        for gp, g, x in zip(columns['games_played'], columns['goals_scored'], columns['expected_goals'])
+    ]
+
+def defense_scores(columns, weights=DEFAULT_WEIGHTS):
+    """Defence score per team, None for teams that have not played"""
+    wc, wx, ws = weights['goals_conceded'], weights['expected_goals_conceded'], weights['clean_sheets']
+    return [
+        (c * wc + x * wx) / gp - cs * ws if gp else None
+        for gp, c, x, cs in zip(
+            columns['games_played'], columns['goals_conceded'],
+            columns['expected_goals_conceded'], columns['clean_sheets']
+        )
+    ]
+
+def attack_score_sql(alias='ts', weights=DEFAULT_WEIGHTS):
+    """SQL expression for the attack score of a team_stats_* row"""
+    return (
+        f"({alias}.goals_scored * {weights['goals']} + {alias}.expected_goals * {weights['expected_goals']}) "
+        f"/ NULLIF({alias}.games_played, 0)"
+    )
+
+def defense_score_sql(alias='ts', weights=DEFAULT_WEIGHTS):
+    """SQL expression for the defence score of a team_stats_* row"""
+    return (
+        f"({alias}.goals_conceded * {weights['goals_conceded']} "
+        f"+ {alias}.expected_goals_conceded * {weights['expected_goals_conceded']}) "
+        f"/ NULLIF({alias}.games_played, 0) - ({alias}.clean_sheets * {weights['clean_sheets']})"
+    )
+
+def rank_scores(scores, descending, team_ids):
+    """Ordinal 1..N ranks for a score column; ties go to the lower team_id, teams without a score rank last
+
+    Same order as ROW_NUMBER() in team_ranks_mv, so the API and the view agree.
+    """
+    sign = -1 if descending else 1
+    order = sorted(
+        range(len(scores)),
+        key=lambda i: (scores[i] is None, sign * scores[i] if scores[i] is not None else 0, team_ids[i])
+    )
+    ranks = [0] * len(scores)
+    for position, index in enumerate(order, start=1):
+        ranks[index] = position
+    return ranks
+
+def rank_location(columns, weights=DEFAULT_WEIGHTS):
+    """Compute attack/defence scores and ranks for one location's columns"""
+    attack = attack_scores(columns, weights)
+    defense = defense_scores(columns, weights)
+    return {
+        'team_id': columns['team_id'],
+        'team_name': columns['team_name'],
+        'attack_score': attack,
+        'defense_score': defense,
+        'attack_rank': rank_scores(attack, descending=True, team_ids=columns['team_id']),
+        'defense_rank': rank_scores(defense, descending=False, team_ids=columns['team_id']),
+    }
+
+def compute_team_rankings(stats_by_location, weights=None):
+    """Rank every team for home, away and overall stats in one pass
+
+    stats_by_location maps 'home'/'away'/'overall' to lists of team stats rows
+    (as stored in team_stats_* / team-stats.json). Returns
+    {location: {team_id: {'attack_score', 'defense_score', 'attack_rank', 'defense_rank'}}}.
+    """
+    weights = resolve_weights(weights)
+    rankings = {}
+    for location, rows in stats_by_location.items():
+        ranked = rank_location(to_columns(rows), weights)
+        rankings[location] = {
+            team_id: {
+                'attack_score': ranked['attack_score'][i],
+                'defense_score': ranked['defense_score'][i],
+                'attack_rank': ranked['attack_rank'][i],
+                'defense_rank': ranked['defense_rank'][i],
+            }
+            for i, team_id in enumerate(ranked['team_id'])
+        }
+    return rankings
+
+def ranking_list(columns, ranking_type, weights=DEFAULT_WEIGHTS):
+    """Build the team-rankings.json list for 'attack' or 'defense'
+
+    Every team is listed; teams that have not played yet rank last with a
+    null weighted_score.
+    """
+    ranked = rank_location(columns, weights)
+    scores = ranked[f'{ranking_type}_score']
+    ranks = ranked[f'{ranking_type}_rank']
+    order = sorted(range(len(scores)), key=lambda i: ranks[i])
+    return [
+        {
+            'team_id': ranked['team_id'][i],
+            'team_name': ranked['team_name'][i],
+            'rank': position,
+            'weighted_score': scores[i]
+        }
+        for position, i in enumerate(order, start=1)
+    ]
@@ -1,212 +1,233 @@
+import hashlib
 import json
 import os
+import threading
 from datetime import datetime
+from data_store import data_path
+
+# Data validation engine.
+#
+# Each data file has a declarative schema: the top-level lists it must contain
+# and, per list, the fields every row needs with their allowed types. Schemas
+# are compiled once into per-field checks that run column-wise (one pass per
+# field over all rows). Each file is read and parsed once per validation, and
+# results are cached by the SHA-256 of the file contents, so an unchanged
+# file is never re-parsed. validation_status() also skips re-hashing while
+# the file's mtime and size are unchanged, which is what /api/data-status uses.
+
+OPTIONAL_NUMBER = (int, float, type(None))
+OPTIONAL_INT = (int, type(None))
+
+SCHEMAS = {
+    'teams.json': {
+        'data': {'id': int, 'name': str, 'short_name': str, 'code': str},
+    },
+    'players.json': {
+        'data': {'id': int, 'web_name': str, 'element_type': int, 'team_id': int},
+    },
+    'fixtures.json': {
+        'data': {'id': int, 'event': OPTIONAL_INT, 'team_h': OPTIONAL_INT, 'team_a': OPTIONAL_INT},
+    },
+    'team-stats.json': {
+        location: {'team_id': int, 'team_name': str, 'games_played': int}
+        for location in ['home', 'away', 'overall']
+    },
+    'team-rankings.json': {
+        ranking_type: {'rank': int, 'team_id': int, 'weighted_score': OPTIONAL_NUMBER}
+        for ranking_type in ['attack', 'defense']
+    },
+}
+
+DATA_FILES = list(SCHEMAS)
+
+# What the rows of a file's 'data' list are called in reports
+ROW_LABELS = {'teams.json': 'teams', 'players.json': 'players', 'fixtures.json': 'fixtures'}
+
+# Data older than this is reported as stale
+MAX_AGE_DAYS = 1
+
+_MISSING = object()
+_results = {}         # content hash -> validation result
+_signatures = {}      # filename -> ((mtime_ns, size), content hash)
+_lock = threading.Lock()
+
+def _type_name(types):
+    types = types if isinstance(types, tuple) else (types,)
+    return '/'.join('null' if t is type(None) else t.__name__ for t in types)
+
+def compile_schema(schema):
+    """Compile {list name: {field: types}} into [(list name, [(field, check, type name)])]"""
+    compiled = []
+    for list_name, fields in schema.items():
+        checks = []
+        for field, types in fields.items():
+            def check(column, types=types):
+                """Indexes of rows whose value is missing or of the wrong type"""
+                return [i for i, value in enumerate(column) if value is _MISSING or not isinstance(value, types)]
+            checks.append((field, check, _type_name(types)))
+        compiled.append((list_name, checks))
+    return compiled
+
+COMPILED_SCHEMAS = {filename: compile_schema(schema) for filename, schema in SCHEMAS.items()}
+
+def validate_document(data, compiled_schema):
+    """Validate a parsed document: returns (errors, {list name: row count})"""
+    errors = []
+    counts = {}
+
+    if not isinstance(data, dict):
+        return ["Top level is not an object"], counts
+    if 'last_updated' not in data:
+        errors.append("Missing last_updated field")
+
+    for list_name, checks in compiled_schema:
+        rows = data.get(list_name, _MISSING)
+        if rows is _MISSING:
+            errors.append(f"Missing {list_name} field")
+            continue
+        if not isinstance(rows, list):
+            errors.append(f"{list_name} is not a list")
+            continue
+        if not rows:
+            errors.append(f"{list_name} is empty")
+            continue
+        counts[list_name] = len(rows)
+
+        if not all(isinstance(row, dict) for row in rows):
+            errors.append(f"{list_name} contains rows that are not objects")
+            continue
+        for field, check, type_name in checks:
+            column = [row.get(field, _MISSING) for row in rows]
+            bad_rows = check(column)
+            if bad_rows:
+                first = bad_rows[0]
+                problem = 'missing' if column[first] is _MISSING else f"not {type_name}"
+                errors.append(f"{list_name}[{first}].{field} is {problem} ({len(bad_rows)} rows)")
+
+    return errors, counts
+
+def validate_bytes(filename, content):
+    """Validate file contents, reusing the cached result for identical content"""
+    digest = hashlib.sha256(content).hexdigest()
+    with _lock:
+        result = _results.get(digest)
+    if result is not None and result['file'] == filename:
+        return result
 
-def validate_json_file(file_path, required_fields=None):
-    """Validate a JSON file exists and has required structure"""
     try:
-        if not os.path.exists(file_path):
-            return False, f"File not found: {file_path}"
-        
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        
-        # Check for last_updated field
-        if 'last_updated' not in data:
-            return False, f"Missing last_updated field in {file_path}"
-        
-        # Check for data field (if required)
-        if required_fields:
-            if 'data' not in data:
-                return False, f"Missing data field in {file_path}"
-            
-            if not isinstance(data['data'], list):
-                return False, f"Data field is not a list in {file_path}"
-            
-            if len(data['data']) == 0:
-                return False, f"Data field is empty in {file_path}"
-        
-        return True, f"✅ {file_path} is valid"
-        
-    except json.JSONDecodeError as e:
-        return False, f"Invalid JSON in {file_path}: {e}"
-    except Exception as e:
-        return False, f"Error reading {file_path}: {e}"
-
-def validate_teams_data():
-    """Validate teams.json"""
-    required_fields = ['id', 'name', 'short_name', 'code']
-    
-    is_valid, message = validate_json_file('data/teams.json', required_fields)
-    if not is_valid:
-        return False, message
-    
-    with open('data/teams.json', 'r') as f:
-        data = json.load(f)
-    
-    # Check for required fields in each team
-    for i, team in enumerate(data['data']):
-        for field in required_fields:
-            if field not in team:
-                return False, f"Team {i} missing required field: {field}"
-    
-    return True, f"✅ Teams data valid: {len(data['data'])} teams"
-
-def validate_players_data():
-    """Validate players.json"""
-    required_fields = ['id', 'web_name', 'element_type', 'team_id']
-    
-    is_valid, message = validate_json_file('data/players.json', required_fields)
-    if not is_valid:
-        return False, message
-    
-    with open('data/players.json', 'r') as f:
-        data = json.load(f)
-    
-    # Check for required fields in each player
-    for i, player in enumerate(data['data']):
-        for field in required_fields:
-            if field not in player:
-                return False, f"Player {i} missing required field: {field}"
-    
-    return True, f"✅ Players data valid: {len(data['data'])} players"
-
-def validate_fixtures_data():
-    """Validate fixtures.json"""
-    required_fields = ['id', 'event', 'team_h', 'team_a']
-    
-    is_valid, message = validate_json_file('data/fixtures.json', required_fields)
-    if not is_valid:
-        return False, message
-    
-    with open('data/fixtures.json', 'r') as f:
-        data = json.load(f)
-    
-    # Check for required fields in each fixture
-    for i, fixture in enumerate(data['data']):
-        for field in required_fields:
-            if field not in fixture:
-                return False, f"Fixture {i} missing required field: {field}"
-    
-    return True, f"✅ Fixtures data valid: {len(data['data'])} fixtures"
-
-def validate_team_stats_data():
-    """Validate team-stats.json"""
-    is_valid, message = validate_json_file('data/team-stats.json')
-    if not is_valid:
-        return False, message
-    
-    with open('data/team-stats.json', 'r') as f:
-        data = json.load(f)
-    
-    # Check for required locations
-    required_locations = ['home', 'away', 'overall']
-    for location in required_locations:
-        if location not in data:
-            return False, f"Missing {location} stats in team-stats.json"
-        
-        if not isinstance(data[location], list):
-            return False, f"{location} stats is not a list"
-        
-        if len(data[location]) == 0:
-            return False, f"{location} stats is empty"
-    
-    return True, f"✅ Team stats valid: {len(data['home'])} home, {len(data['away'])} away, {len(data['overall'])} overall"
-
-def validate_team_rankings_data():
-    """Validate team-rankings.json"""
-    is_valid, message = validate_json_file('data/team-rankings.json')
-    if not is_valid:
-        return False, message
-    
-    with open('data/team-rankings.json', 'r') as f:
-        data = json.load(f)
-    
-    # Check for required ranking types
-    required_types = ['attack', 'defense']
-    for ranking_type in required_types:
-        if ranking_type not in data:
-            return False, f"Missing {ranking_type} rankings in team-rankings.json"
-        
-        if not isinstance(data[ranking_type], list):
-            return False, f"{ranking_type} rankings is not a list"
-        
-        if len(data[ranking_type]) == 0:
-            return False, f"{ranking_type} rankings is empty"
-    
-    return True, f"✅ Team rankings valid: {len(data['attack'])} attack, {len(data['defense'])} defense"
-
-def check_data_freshness():
-    """Check if data is recent (within last 24 hours)"""
-    data_files = [
-        'data/teams.json',
-        'data/players.json',
-        'data/fixtures.json',
-        'data/team-stats.json',
-        'data/team-rankings.json'
-    ]
-    
-    current_time = datetime.now()
-    freshness_issues = []
-    
-    for file_path in data_files:
-        if os.path.exists(file_path):
-            try:
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
-                
-                last_updated_str = data.get('last_updated', '')
-                if last_updated_str:
-                    last_updated = datetime.fromisoformat(last_updated_str.replace('Z', '+00:00'))
-                    time_diff = current_time - last_updated.replace(tzinfo=None)
-                    
-                    if time_diff.days > 1:
-                        freshness_issues.append(f"{file_path}: {time_diff.days} days old")
-                else:
-                    freshness_issues.append(f"{file_path}: No last_updated field")
-            except Exception as e:
-                freshness_issues.append(f"{file_path}: Error checking freshness - {e}")
-        else:
-            freshness_issues.append(f"{file_path}: File not found")
-    
-    return freshness_issues
+        data = json.loads(content)
+        errors, counts = validate_document(data, COMPILED_SCHEMAS[filename])
+        last_updated = data.get('last_updated') if isinstance(data, dict) else None
+    except ValueError as e:
+        errors, counts, last_updated = [f"Invalid JSON: {e}"], {}, None
+
+    result = {
+        'file': filename,
+        'exists': True,
+        'valid': not errors,
+        'errors': errors,
+        'counts': counts,
+        'last_updated': last_updated,
+        'size': len(content),
+        'sha256': digest
+    }
+    with _lock:
+        _results[digest] = result
+    return result
+
+def validate_file(filename):
+    """Read data/<filename> once and validate it against its schema"""
+    path = data_path(filename)
+    try:
+        with open(path, 'rb') as f:
+            content = f.read()
+    except FileNotFoundError:
+        return {'file': filename, 'exists': False, 'valid': False, 'errors': [f"File not found: {path}"]}
+    return validate_bytes(filename, content)
+
+def validation_status(filename):
+    """Cached validation result; the file is only re-read when its mtime or size changes"""
+    path = data_path(filename)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return {'file': filename, 'exists': False, 'valid': False, 'errors': [f"File not found: {path}"]}
+
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        cached = _signatures.get(filename)
+        if cached and cached[0] == signature and cached[1] in _results:
+            return _results[cached[1]]
+
+    result = validate_file(filename)
+    if result['exists']:
+        with _lock:
+            _signatures[filename] = (signature, result['sha256'])
+    return result
+
+def freshness_issue(result, now=None):
+    """Return a freshness problem for a validation result, or None"""
+    if not result['exists']:
+        return "File not found"
+    last_updated_str = result.get('last_updated')
+    if not last_updated_str:
+        return "No last_updated field"
+    try:
+        last_updated = datetime.fromisoformat(last_updated_str.replace('Z', '+00:00'))
+    except ValueError as e:
+        return f"Error checking freshness - {e}"
+    age = (now or datetime.now()) - last_updated.replace(tzinfo=None)
+    if age.days > MAX_AGE_DAYS:
+        return f"{age.days} days old"
+    return None
+
+def summary_message(result):
+    """One-line message in the style of the validation report"""
+    if not result['valid']:
+        return f"❌ {result['file']}: " + '; '.join(result['errors'])
+    counts = ', '.join(
+        f"{count} {ROW_LABELS.get(result['file'], name) if name == 'data' else name}"
+        for name, count in result['counts'].items()
+    )
+    return f"✅ {result['file']} valid: {counts}"
+
+def check_data_freshness(results=None):
+    """Check if data is recent (within MAX_AGE_DAYS), using the validation results"""
+    results = results or [validation_status(filename) for filename in DATA_FILES]
+    now = datetime.now()
+    issues = []
+    for result in results:
+        issue = freshness_issue(result, now)
+        if issue:
+            issues.append(f"data/{result['file']}: {issue}")
+    return issues
 
 def main():
     """Main validation function"""
     print("🔍 Validating FPL data files...")
     print("=" * 50)
-    
+
     # Check if data directory exists
-    if not os.path.exists('data'):
+    if not os.path.exists(data_path('')):
         print("❌ Data directory not found!")
         return False
-    
-    # Validate each data file
-    validations = [
-        validate_teams_data,
-        validate_players_data,
-        validate_fixtures_data,
-        validate_team_stats_data,
-        validate_team_rankings_data
-    ]
-    
-    all_valid = True
-    for validation in validations:
-        is_valid, message = validation()
-        print(message)
-        if not is_valid:
-            all_valid = False
-    
+
+    # Validate each data file (one read and parse per file)
+    results = [validate_file(filename) for filename in DATA_FILES]
+    for result in results:
+        print(summary_message(result))
+    all_valid = all(result['valid'] for result in results)
+
     # Check data freshness
     print("\n📅 Checking data freshness...")
-    freshness_issues = check_data_freshness()
+    freshness_issues = check_data_freshness(results)
     if freshness_issues:
         print("⚠️  Data freshness issues:")
         for issue in freshness_issues:
             print(f"   - {issue}")
     else:
         print("✅ All data files are recent")
-    
+
     # Summary
     print("\n" + "=" * 50)
     if all_valid and not freshness_issues:
@@ -218,4 +239,4 @@ def main():
 
 if __name__ == "__main__":
     success = main()
-    exit(0 if success else 1) 
\ No newline at end of file
+    exit(0 if success else 1)